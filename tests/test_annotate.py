@@ -0,0 +1,64 @@
+import json
+
+import numpy as np
+from PIL import Image
+
+from webrssbench.annotate import annotate_page, annotate_position_page, annotate_text_page
+
+
+def save(path, pixels):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(pixels).save(path)
+
+
+def page(h, w, seed):
+    return np.random.default_rng(seed).integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def test_position_crops_and_boxes(tmp_path):
+    pixels = page(30, 49, 0)
+    save(tmp_path / "random_crops" / "original.png", pixels)
+    block = {"id": "b1", "box": {"x": 1 / 49, "y": 3 / 30, "width": 7 / 49, "height": 5 / 30}}
+    meta = {"elements": {"page_size": [49, 30], "selected_blocks": [block]}}
+
+    assert annotate_position_page(tmp_path, meta, color="blue")
+    crop = np.asarray(Image.open(tmp_path / "random_crops" / "crop_b1.png"))
+    assert np.array_equal(crop, pixels[3:8, 1:8])
+    boxed = np.asarray(Image.open(tmp_path / "random_crops" / "layout_with_boxes.png"))
+    assert boxed.shape == pixels.shape
+    assert tuple(boxed[3, 1]) == (0, 0, 255)
+    # 框外像素不变
+    assert np.array_equal(boxed[20:, 20:], pixels[20:, 20:])
+
+
+def test_position_page_without_render(tmp_path):
+    assert not annotate_position_page(tmp_path, {"elements": {"selected_blocks": []}})
+
+
+def test_text_boxes_drawn_on_both_renders(tmp_path):
+    before, after = page(40, 60, 1), page(40, 60, 2)
+    save(tmp_path / "original.png", before)
+    save(tmp_path / "disturbed.png", after)
+    meta = {"selected_buttons": [{"id": 1, "bounding_box": [10, 25, 20, 10]}]}
+
+    assert annotate_text_page(tmp_path, meta, color="lime", width=1, label_offset=0)
+    for name, src in (("annotated_before.png", before), ("annotated_after.png", after)):
+        img = np.asarray(Image.open(tmp_path / name))
+        assert img.shape == src.shape
+        assert tuple(img[35, 30]) == (0, 255, 0)
+        assert np.array_equal(img[:, 40:], src[:, 40:])
+
+
+def test_text_page_missing_render(tmp_path):
+    save(tmp_path / "original.png", page(10, 10, 0))
+    assert not annotate_text_page(tmp_path, {"selected_buttons": []})
+
+
+def test_annotate_page_dispatches_on_record(tmp_path):
+    save(tmp_path / "original.png", page(20, 20, 0))
+    save(tmp_path / "disturbed.png", page(20, 20, 1))
+    meta = {"selected_buttons": [{"id": 1, "bounding_box": [2, 2, 5, 5]}]}
+    (tmp_path / "analysis_result.json").write_text(json.dumps(meta), encoding="utf-8")
+    assert annotate_page(tmp_path / "analysis_result.json")
+    assert (tmp_path / "annotated_before.png").exists()
+    assert not annotate_page(tmp_path / "missing.json")
@@ -0,0 +1,89 @@
+import random
+from pathlib import Path
+
+from webrssbench.dedup import (
+    MultiIndexHash, build_cluster_map, cluster_pages, dom_hash, filter_paths, find_render, hamming, keep_page,
+)
+
+
+def test_multi_index_matches_brute_force():
+    rng = random.Random(0)
+    values = {i: rng.getrandbits(64) for i in range(300)}
+    # 一些近邻，保证有命中
+    for i in range(300, 400):
+        v = values[i - 300]
+        for _ in range(rng.randint(0, 5)):
+            v ^= 1 << rng.randrange(64)
+        values[i] = v
+
+    index = MultiIndexHash(threshold=4)
+    for k, v in values.items():
+        index.add(k, v)
+    for k, v in list(values.items())[::7]:
+        expected = {o for o, ov in values.items() if hamming(v, ov) <= 4}
+        assert set(index.query(v)) == expected
+
+
+def test_dom_hash_ignores_text_and_attributes():
+    a = "<html><body><div class='x'><p>hello</p><a href='/a'>one</a></div></body></html>"
+    b = "<html><body><div class='y'><p>bye</p><a href='/b'>two</a></div></body></html>"
+    c = "<html><body><table><tr><td>1</td></tr></table><ul><li>x</li><li>y</li></ul></body></html>"
+    assert dom_hash(a) == dom_hash(b)
+    assert dom_hash(a) != dom_hash(c)
+
+
+def test_cluster_pages_dom_and_image_gate():
+    hashes = {
+        "a": (0b0000, 0),
+        "b": (0b0001, 0b1),          # DOM 和外观都接近 a
+        "c": (0b0011, 0xFFFF),       # DOM 接近，外观差 16 位
+        "d": (1 << 40 | 0xFF00, 0),  # DOM 远
+    }
+    assert cluster_pages(hashes, dom_threshold=3, phash_threshold=6) == [["a", "b"], ["c"], ["d"]]
+
+
+def test_renderless_page_does_not_bridge_renders():
+    # a、c 的 DOM 都接近 b，但外观相差 16 位；b 没有渲染图，不能把 a 和 c 连起来
+    hashes = {"a": (0, 0), "b": (1, None), "c": (2, 0xFFFF)}
+    clusters = cluster_pages(hashes, dom_threshold=3, phash_threshold=6)
+    assert not any({"a", "c"} <= set(m) for m in clusters)
+
+
+def test_renderless_pages_cluster_by_dom():
+    hashes = {"a": (0, None), "b": (1, None), "c": (1 << 50 | 0xFFFF, None)}
+    assert cluster_pages(hashes, dom_threshold=3) == [["a", "b"], ["c"]]
+
+
+def test_keep_page_prefers_representative():
+    hashes = {k: (0, None) for k in ("a", "b", "c")}
+    cluster_map = build_cluster_map([["a", "b", "c"]], hashes)
+    assert cluster_map["clusters"][0]["representative"] == "a"
+
+    counts = {}
+    assert [k for k in ("c", "b", "a") if keep_page(k, cluster_map, counts, 1)] == ["a"]
+    counts = {}
+    assert [k for k in ("c", "b", "a") if keep_page(k, cluster_map, counts, 2)] == ["c", "a"]
+    # 不在聚类图里的页面总是保留
+    assert keep_page("new.html", cluster_map, {}, 1)
+
+
+def test_filter_paths_is_lazy_and_keeps_representative(tmp_path):
+    cluster_map = build_cluster_map([["easy/1.html", "easy/2.html"]], {"easy/1.html": (0, None), "easy/2.html": (0, None)})
+    paths = [tmp_path / "easy" / "2.html", tmp_path / "easy" / "1.html"]
+    kept = filter_paths(iter(paths), tmp_path, cluster_map, 1)
+    assert not isinstance(kept, list)
+    assert list(kept) == [tmp_path / "easy" / "1.html"]
+
+
+def test_find_render_layouts(tmp_path):
+    rel = Path("easy/1.html")
+    layouts = {
+        "mirrored": tmp_path / "mirrored" / "easy" / "1" / "original.png",
+        "flat": tmp_path / "flat" / "1" / "original.png",
+        "position": tmp_path / "position" / "1" / "random_crops" / "original.png",
+    }
+    for name, png in layouts.items():
+        png.parent.mkdir(parents=True)
+        png.write_bytes(b"")
+        assert find_render(tmp_path / name, rel) == png
+    assert find_render(tmp_path / "missing", rel) is None
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from webrssbench import discovery
+from webrssbench.discovery import FileIndex, file_hash, iter_html_files
+
+
+def touch(path, text="x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def bump(path):
+    """目录 mtime 前移一秒，不依赖文件系统的时间精度。"""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def rel(paths, root):
+    return [p.relative_to(root).as_posix() for p in paths]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / "corpus"
+    touch(root / "easy" / "1.html")
+    touch(root / "easy" / "2.html")
+    touch(root / "easy" / "notes.txt")
+    touch(root / "hard" / "sub" / "3.htm")
+    return root
+
+
+@pytest.fixture
+def index(tmp_path):
+    with FileIndex(tmp_path / "index.sqlite") as idx:
+        yield idx
+
+
+def test_plain_and_indexed_walks_agree(corpus, index):
+    plain = rel(iter_html_files(corpus), corpus)
+    assert plain == ["easy/1.html", "easy/2.html", "hard/sub/3.htm"]
+    assert rel(iter_html_files(corpus, index=index), corpus) == plain
+    assert rel(iter_html_files(corpus, index=index), corpus) == plain
+    assert rel(iter_html_files(corpus, index=index, recursive=False), corpus) == []
+    assert rel(iter_html_files(corpus / "easy", ("*.html",), index=index, recursive=False), corpus) == \
+        ["easy/1.html", "easy/2.html"]
+
+
+def test_unchanged_directories_are_not_listed(corpus, index, monkeypatch):
+    list(iter_html_files(corpus, index=index))
+
+    def fail(path):
+        raise AssertionError(f"listed {path}")
+
+    monkeypatch.setattr(discovery.os, "scandir", fail)
+    assert rel(iter_html_files(corpus, index=index), corpus) == ["easy/1.html", "easy/2.html", "hard/sub/3.htm"]
+
+
+def test_added_and_deleted_files(corpus, index):
+    list(iter_html_files(corpus, index=index))
+
+    touch(corpus / "easy" / "0.html")
+    (corpus / "easy" / "2.html").unlink()
+    bump(corpus / "easy")
+    assert rel(iter_html_files(corpus, index=index), corpus) == ["easy/0.html", "easy/1.html", "hard/sub/3.htm"]
+    assert index.lookup(corpus.resolve() / "easy" / "2.html") is None
+
+
+def test_deleted_subdirectory(corpus, index):
+    list(iter_html_files(corpus, index=index))
+
+    for f in (corpus / "hard" / "sub").iterdir():
+        f.unlink()
+    (corpus / "hard" / "sub").rmdir()
+    bump(corpus / "hard")
+    assert rel(iter_html_files(corpus, index=index), corpus) == ["easy/1.html", "easy/2.html"]
+    gone = str(corpus.resolve() / "hard" / "sub")
+    assert index.db.execute("SELECT COUNT(*) FROM files WHERE dir = ?", (gone,)).fetchone()[0] == 0
+    assert index.db.execute("SELECT COUNT(*) FROM dirs WHERE path = ?", (gone,)).fetchone()[0] == 0
+
+
+def test_in_place_edit_needs_rescan(corpus, index):
+    list(iter_html_files(corpus, index=index))
+    page = corpus.resolve() / "easy" / "1.html"
+    old = index.lookup(page)
+
+    # 原地修改不改变目录 mtime：普通运行沿用索引，--rescan 才重新 stat
+    page.write_text("changed content", encoding="utf-8")
+    list(iter_html_files(corpus, index=index))
+    assert index.lookup(page) == old
+    list(iter_html_files(corpus, index=index, rescan=True))
+    size, _, digest = index.lookup(page)
+    assert size == len("changed content") and digest == file_hash(page)
+
+
+def test_hashes_are_lazy(corpus, index, monkeypatch):
+    calls = []
+    monkeypatch.setattr(discovery, "file_hash", lambda p: calls.append(p) or "h")
+    list(iter_html_files(corpus, index=index))
+    assert calls == []
+
+    page = corpus.resolve() / "easy" / "1.html"
+    assert index.lookup(page)[2] == "h"
+    assert index.fill_hashes() == 2
+    assert len(calls) == 3
+
+
+def test_paths_stream_before_directory_is_done(corpus, index):
+    it = iter_html_files(corpus, index=index)
+    first = next(it)
+    assert first.name == "1.html"
+    # 目录还没读完，目录记录尚未写入
+    assert index.db.execute("SELECT COUNT(*) FROM dirs").fetchone()[0] == 1
+
+
+def test_index_is_keyed_by_resolved_root(corpus, index, monkeypatch):
+    list(iter_html_files(corpus, index=index))
+    monkeypatch.chdir(corpus)
+    assert [p.as_posix() for p in iter_html_files(".", index=index)] == ["easy/1.html", "easy/2.html", "hard/sub/3.htm"]
+    assert index.db.execute("SELECT COUNT(*) FROM dirs").fetchone()[0] == 4
@@ -0,0 +1,40 @@
+import pytest
+
+from webrssbench.layoutRobustness import STABLE_ID_ATTR, disturb_source, layout_shift
+from webrssbench.seeding import page_rng
+
+PAGE = """<html><body>
+<div><p>Intro</p><form><input type="submit" value="Send"><button type="submit">Go</button></form></div>
+<section><div><span>deep</span></div></section>
+</body></html>"""
+
+
+def test_layout_shift_counts_moves_and_vanished():
+    before = {"1": [0, 0, 10, 10], "2": [0, 20, 10, 10], "3": [5, 5, 5, 5], "4": [0, 0, 1, 1]}
+    after = {"1": [0.2, 0, 10, 10], "2": [0, 35, 10, 10], "3": [5, 5, 8, 5]}
+    shift = layout_shift(before, after)
+    assert shift["elements_compared"] == 3
+    assert shift["elements_vanished"] == 1
+    # 位移在容差内的不算移动；尺寸变化算
+    assert [m["id"] for m in shift["moved_elements"]] == ["2", "3"]
+    assert shift["moved_elements"][0]["dy"] == 15
+    assert shift["moved_ratio"] == round(2 / 3, 4)
+    assert shift["max_shift"] == 15
+
+
+def test_layout_shift_empty():
+    shift = layout_shift({}, {"1": [0, 0, 1, 1]})
+    assert shift["moved_count"] == 0 and shift["moved_ratio"] == 0.0 and shift["max_shift"] == 0.0
+
+
+@pytest.mark.parametrize("level", ["easy", "medium", "hard"])
+def test_disturb_source(level):
+    pytest.importorskip("bs4")
+    pytest.importorskip("lxml")
+
+    stamped, disturbed, published = disturb_source(PAGE, level, page_rng(1, "p"))
+    assert STABLE_ID_ATTR in stamped and STABLE_ID_ATTR in disturbed
+    # 发布的 HTML 不带测量用的编号
+    assert STABLE_ID_ATTR not in published
+    assert 'id="ghost-' in published and 'id="ghost-' not in stamped
+    assert disturb_source(PAGE, level, page_rng(1, "p")) == (stamped, disturbed, published)
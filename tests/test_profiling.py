@@ -0,0 +1,25 @@
+from webrssbench.profiling import SlowPageMonitor, run_page
+
+
+def test_rerun_writes_to_scratch_output(tmp_path):
+    out = tmp_path / "out"
+    calls = []
+
+    def work(html, output_dir):
+        calls.append(output_dir)
+        page = output_dir / html
+        page.mkdir(parents=True, exist_ok=True)
+        (page / "result.txt").write_text(str(len(calls)), encoding="utf-8")
+        return len(calls) == 1
+
+    monitor = SlowPageMonitor(out, threshold=-1)
+    assert run_page(monitor, "easy/1.html", work, "1", out, output_arg="output_dir")
+    scratch = out / "slow_pages" / "easy__1.html" / "output"
+    assert calls == [out, scratch]
+    # 首次运行的输出不被重跑覆盖
+    assert (out / "1" / "result.txt").read_text(encoding="utf-8") == "1"
+    assert (scratch / "1" / "result.txt").read_text(encoding="utf-8") == "2"
+
+
+def test_no_monitor_calls_directly(tmp_path):
+    assert run_page(None, "k", lambda output_dir: output_dir, tmp_path, output_arg="output_dir") == tmp_path
@@ -0,0 +1,137 @@
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from webrssbench.raster_store import ALIGN, DATA_NAME, RasterStore, RasterStoreWriter, build_store, compact_store
+
+BLOCK = {"id": "b1", "box": {"x": 0.25, "y": 0.5, "width": 0.5, "height": 0.25}}
+
+
+def make_position_output(root, pages):
+    """position 输出：<stem>/analysis_result.json + random_crops/original.png。"""
+    for stem, pixels in pages.items():
+        crops = root / stem / "random_crops"
+        crops.mkdir(parents=True)
+        Image.fromarray(pixels).save(crops / "original.png")
+        h, w = pixels.shape[:2]
+        meta = {"elements": {"page_size": [w, h], "all_blocks": [BLOCK], "selected_blocks": [BLOCK]}}
+        (root / stem / "analysis_result.json").write_text(json.dumps(meta), encoding="utf-8")
+
+
+def page(h, w, seed):
+    return np.random.default_rng(seed).integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def test_crops_are_zero_copy_views(tmp_path):
+    pixels = page(40, 20, 0)
+    with RasterStoreWriter(tmp_path) as writer:
+        writer.add("p", pixels, blocks=[BLOCK])
+    store = RasterStore(tmp_path)
+
+    img = store.image("p")
+    assert np.array_equal(img, pixels)
+    crop = store.crop("p", {"x": 2, "y": 3, "width": 5, "height": 4})
+    assert np.array_equal(crop, pixels[3:7, 2:7])
+    assert np.shares_memory(crop, store.data)
+    # 归一化坐标按页面尺寸缩放
+    assert np.array_equal(store.block_crop("p", "b1"), pixels[20:30, 5:15])
+    # 越界裁剪被截断
+    assert store.crop("p", {"x": 15, "y": 35, "width": 50, "height": 50}).shape == (5, 5, 3)
+    with pytest.raises(KeyError):
+        store.block_crop("p", "missing")
+
+
+def test_pages_are_aligned(tmp_path):
+    with RasterStoreWriter(tmp_path) as writer:
+        writer.add("a", page(3, 5, 0))
+        writer.add("b", page(7, 3, 1))
+    store = RasterStore(tmp_path)
+    assert all(store.index[k]["offset"] % ALIGN == 0 for k in store.keys())
+    assert sorted(store.iter_blocks()) == []
+
+
+def test_rebuild_skips_stored_keys(tmp_path):
+    out = tmp_path / "run1"
+    make_position_output(out, {"a": page(10, 8, 0), "b": page(12, 8, 1)})
+    store_dir = tmp_path / "store"
+
+    assert build_store(out, store_dir, workers=1) == 2
+    size = (store_dir / DATA_NAME).stat().st_size
+    assert build_store(out, store_dir, workers=1) == 0
+    assert (store_dir / DATA_NAME).stat().st_size == size
+
+    store = RasterStore(store_dir)
+    assert sorted(store.keys()) == ["run1/a", "run1/b"]
+    assert sorted(store.iter_blocks()) == [("run1/a", "b1"), ("run1/b", "b1")]
+
+
+def test_runs_are_namespaced(tmp_path):
+    make_position_output(tmp_path / "run1", {"a": page(10, 8, 0)})
+    make_position_output(tmp_path / "run2", {"a": page(10, 8, 1)})
+    store_dir = tmp_path / "store"
+    build_store(tmp_path / "run1", store_dir, workers=1)
+    build_store(tmp_path / "run2", store_dir, workers=1)
+
+    store = RasterStore(store_dir)
+    assert not np.array_equal(store.image("run1/a"), store.image("run2/a"))
+
+
+def test_replace_then_compact(tmp_path):
+    out = tmp_path / "run"
+    pages = {"a": page(10, 8, 0), "b": page(12, 8, 1)}
+    make_position_output(out, pages)
+    store_dir = tmp_path / "store"
+    build_store(out, store_dir, workers=1)
+    size = (store_dir / DATA_NAME).stat().st_size
+
+    assert build_store(out, store_dir, workers=1, replace=True) == 2
+    assert (store_dir / DATA_NAME).stat().st_size > size
+    assert compact_store(store_dir) > 0
+    assert (store_dir / DATA_NAME).stat().st_size == size
+
+    store = RasterStore(store_dir)
+    for stem, pixels in pages.items():
+        assert np.array_equal(store.image(f"run/{stem}"), pixels)
+
+
+def test_corrupt_page_is_skipped(tmp_path):
+    out = tmp_path / "run"
+    make_position_output(out, {"good": page(10, 8, 0), "bad": page(10, 8, 1)})
+    (out / "bad" / "random_crops" / "original.png").write_bytes(b"not a png")
+
+    assert build_store(out, tmp_path / "store", workers=1) == 1
+    assert list(RasterStore(tmp_path / "store").keys()) == ["run/good"]
+
+
+def test_pipeline_records(tmp_path):
+    out = tmp_path / "run"
+    pixels = page(16, 8, 0)
+    crops = out / "easy" / "1" / "position" / "random_crops"
+    crops.mkdir(parents=True)
+    Image.fromarray(pixels).save(crops / "original.png")
+    meta = {"original": "original.png", "position": {"page_size": [8, 16], "all_blocks": [BLOCK]}}
+    (out / "easy" / "1" / "analysis_result.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    assert build_store(out, tmp_path / "store", workers=1) == 1
+    store = RasterStore(tmp_path / "store")
+    assert np.array_equal(store.block_crop("run/easy/1", "b1"), pixels[8:12, 2:6])
+
+
+def test_normalized_crop_matches_crop_box(tmp_path):
+    from webrssbench.annotate import crop_box
+
+    pixels = page(30, 49, 2)
+    box = {"x": 1 / 49, "y": 3 / 30, "width": 7 / 49, "height": 5 / 30}
+    with RasterStoreWriter(tmp_path) as writer:
+        writer.add("p", pixels, blocks=[{"id": "b", "box": box}])
+    store = RasterStore(tmp_path)
+
+    scaled = {"x": round(box["x"] * 49, 3), "y": round(box["y"] * 30, 3),
+              "width": round(box["width"] * 49, 3), "height": round(box["height"] * 30, 3)}
+    expected = np.asarray(crop_box(Image.fromarray(pixels), scaled))
+    crop = store.block_crop("p", "b")
+    assert crop.shape == (5, 7, 3)
+    assert np.array_equal(crop, expected)
+    assert np.array_equal(crop, pixels[3:8, 1:8])
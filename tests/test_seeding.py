@@ -0,0 +1,71 @@
+import random
+import uuid
+
+from webrssbench.colorRobustness import choose_recolors
+from webrssbench.profiling import SlowPageMonitor
+from webrssbench.seeding import page_rng, resolve_run_seed, rng_uuid4, viewport_rngs
+from webrssbench.TextRobustness import advanced_perturb_text, select_buttons
+
+
+def test_page_rng_is_pinned():
+    # 固定值：派生方式一变，已发布的数据就无法按种子复现
+    assert page_rng(42, "easy/1.html").getrandbits(64) == 5229380936164782461
+    assert str(rng_uuid4(page_rng(42, "easy/1.html"))) == "20e03f28-62a8-410e-8892-7e41474d317d"
+
+
+def test_page_rng_independent_streams():
+    a = [page_rng(1, "easy/1.html").random() for _ in range(3)]
+    assert len(set(a)) == 1
+    assert page_rng(1, "easy/1.html").random() != page_rng(1, "easy/2.html").random()
+    assert page_rng(1, "easy/1.html").random() != page_rng(2, "easy/1.html").random()
+    # 和处理顺序无关：先消耗别的页面的流不影响这一页
+    other = page_rng(1, "easy/2.html")
+    other.random()
+    assert page_rng(1, "easy/1.html").random() == a[0]
+
+
+def test_viewport_streams_ignore_other_viewports():
+    alone = viewport_rngs(page_rng(1, "easy/1.html"), ["mobile"])
+    both = viewport_rngs(page_rng(1, "easy/1.html"), ["desktop", "mobile"])
+    reordered = viewport_rngs(page_rng(1, "easy/1.html"), ["mobile", "desktop"])
+    assert alone["mobile"].random() == both["mobile"].random() == reordered["mobile"].random()
+    streams = viewport_rngs(page_rng(1, "easy/1.html"), ["desktop", "mobile"])
+    assert streams["desktop"].random() != streams["mobile"].random()
+
+
+def test_rng_uuid4_shape():
+    rng = page_rng(7, "k")
+    ids = [rng_uuid4(rng) for _ in range(50)]
+    assert len(set(ids)) == 50
+    assert all(u.version == 4 and u.variant == uuid.RFC_4122 for u in ids)
+    again = page_rng(7, "k")
+    assert [rng_uuid4(again) for _ in range(50)] == ids
+
+
+def test_resolve_run_seed():
+    assert resolve_run_seed(5) == 5
+    seed = resolve_run_seed(None)
+    assert isinstance(seed, int) and 0 <= seed < 2 ** 63
+
+
+def test_perturbations_follow_page_stream():
+    sizes = [{"x": i, "y": i, "width": 20, "height": 20} for i in range(40)]
+    assert choose_recolors(sizes, 0.4, 50, page_rng(3, "p")) == choose_recolors(sizes, 0.4, 50, page_rng(3, "p"))
+
+    buttons = [{"idx": i, "text": f"Button {i}", "is_plain": True, "bbox": [0, i * 10, 50, 10]} for i in range(10)]
+    first = select_buttons([dict(b) for b in buttons], 3, page_rng(3, "p"))
+    second = select_buttons([dict(b) for b in buttons], 3, page_rng(3, "p"))
+    assert first == second
+    assert advanced_perturb_text("Place order", page_rng(3, "p")) == advanced_perturb_text("Place order", page_rng(3, "p"))
+
+
+def test_slow_page_rerun_restores_page_rng(tmp_path):
+    draws = []
+    monitor = SlowPageMonitor(tmp_path, threshold=-1)
+
+    def work(rng):
+        draws.append(rng.random())
+
+    monitor.run("easy/1.html", work, page_rng(1, "easy/1.html"))
+    assert len(draws) == 2 and draws[0] == draws[1]
+    assert (tmp_path / "slow_pages" / "easy__1.html" / "record.json").exists()
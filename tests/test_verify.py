@@ -0,0 +1,113 @@
+import json
+
+import numpy as np
+from PIL import Image
+
+from webrssbench.verify import changed_mask, main, region_deltas, verify_meta, verify_page
+
+
+def save(path, pixels):
+    Image.fromarray(pixels).save(path)
+    return path
+
+
+def test_region_deltas_matches_direct_sums():
+    rng = np.random.default_rng(0)
+    mask = rng.random((40, 60)) > 0.7
+    boxes = [[0, 0, 60, 40], [5, 7, 10, 3], [55, 35, 20, 20], [-5, -5, 8, 8], [10.4, 2.6, 4.2, 5.1], [70, 70, 5, 5]]
+    changed, area = region_deltas(mask, boxes)
+    for (x, y, w, h), c, a in zip(boxes, changed, area):
+        x0, y0 = int(np.clip(np.floor(x), 0, 60)), int(np.clip(np.floor(y), 0, 40))
+        x1, y1 = int(np.clip(np.ceil(x + w), 0, 60)), int(np.clip(np.ceil(y + h), 0, 40))
+        assert c == mask[y0:y1, x0:x1].sum()
+        assert a == max(x1 - x0, 0) * max(y1 - y0, 0)
+
+
+def test_changed_mask_tolerance_and_common_area():
+    a = np.zeros((10, 10, 3), np.uint8)
+    b = np.zeros((12, 8, 3), np.uint8)
+    b[0, 0] = 10        # 低于容差
+    b[1, 1] = 200
+    mask = changed_mask(a, b)
+    assert mask.shape == (10, 8)
+    assert mask.sum() == 1 and mask[1, 1]
+
+
+def test_verify_meta_detects_change_inside_box(tmp_path):
+    before = np.full((50, 80, 3), 255, np.uint8)
+    after = before.copy()
+    after[10:20, 10:30] = 0
+    save(tmp_path / "original.png", before)
+    save(tmp_path / "disturbed.png", after)
+
+    meta = {"original": "original.png", "disturbed": "disturbed.png",
+            "recolored_buttons": [{"bbox": [10, 10, 20, 10]}, {"bbox": [50, 30, 10, 10]}]}
+    result = verify_meta(meta, tmp_path)
+    assert result["effective"]
+    assert result["effective_regions"] == 1
+    assert result["changed_pixels"] == [200, 0]
+
+    meta["recolored_buttons"] = [{"bbox": [50, 30, 10, 10]}]
+    assert not verify_meta(meta, tmp_path)["effective"]
+
+
+def test_verify_meta_whole_image_and_absolute_paths(tmp_path):
+    img = np.zeros((20, 20, 3), np.uint8)
+    save(tmp_path / "original.png", img)
+    save(tmp_path / "disturbed.png", img)
+    # 绝对路径只取文件名，目录搬动后依然能找到
+    meta = {"original": "/elsewhere/original.png", "disturbed": "/elsewhere/disturbed.png"}
+    result = verify_meta(meta, tmp_path)
+    assert result["regions"] == 1 and not result["effective"]
+
+
+def test_verify_meta_missing_image(tmp_path):
+    result = verify_meta({"original": "original.png", "disturbed": "disturbed.png"}, tmp_path)
+    assert not result["effective"] and "error" in result
+
+
+def test_verify_page_pipeline_stages(tmp_path):
+    base = np.full((30, 30, 3), 255, np.uint8)
+    changed = base.copy()
+    changed[0:10, 0:10] = 0
+    (tmp_path / "text").mkdir()
+    (tmp_path / "color").mkdir()
+    save(tmp_path / "original.png", base)
+    save(tmp_path / "text" / "disturbed.png", changed)
+    save(tmp_path / "color" / "disturbed.png", base)
+    meta = {
+        "original": "original.png",
+        "text": {"disturbed": "text/disturbed.png", "selected_buttons": [{"bounding_box": [0, 0, 10, 10]}]},
+        "color": {"disturbed": "color/disturbed.png", "recolored_buttons": [{"bbox": [0, 0, 10, 10]}]},
+        "layout": {"error": "stage failed"},
+    }
+    meta_path = tmp_path / "analysis_result.json"
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    result = verify_page(meta_path)
+    assert result["stages"] == {"text": True, "color": False}
+    assert not result["effective"]
+    stored = json.loads(meta_path.read_text(encoding="utf-8"))
+    assert stored["text"]["verification"]["effective"]
+
+
+def test_records_without_perturbation_are_skipped(tmp_path):
+    position = {"elements": {"page_size": [10, 10], "all_blocks": []}}
+    pipeline = {"original": "original.png", "position": {"page_size": [10, 10], "all_blocks": []}}
+    for name, meta in (("position", position), ("pipeline", pipeline)):
+        page_dir = tmp_path / "out" / name
+        page_dir.mkdir(parents=True)
+        (page_dir / "analysis_result.json").write_text(json.dumps(meta), encoding="utf-8")
+        result = verify_page(page_dir / "analysis_result.json")
+        assert result["skipped"] and result["effective"]
+        assert json.loads((page_dir / "analysis_result.json").read_text(encoding="utf-8")) == meta
+
+    main([str(tmp_path / "out"), "--reject", "--workers", "1"])
+    assert (tmp_path / "out" / "position").is_dir() and (tmp_path / "out" / "pipeline").is_dir()
+
+
+def test_failed_pipeline_stages_are_rejected(tmp_path):
+    meta = {"original": "original.png", "text": {"error": "stage failed"}}
+    (tmp_path / "analysis_result.json").write_text(json.dumps(meta), encoding="utf-8")
+    result = verify_page(tmp_path / "analysis_result.json")
+    assert not result["effective"] and "error" in result
@@ -0,0 +1,33 @@
+import argparse
+
+import pytest
+
+from webrssbench.viewports import VIEWPORTS, add_viewport_args, parse_viewports
+
+
+def test_presets_and_sizes_keep_order():
+    viewports = parse_viewports("mobile, 1440x900,desktop")
+    assert list(viewports) == ["mobile", "1440x900", "desktop"]
+    assert viewports["1440x900"] == {"width": 1440, "height": 900}
+    assert viewports["mobile"] == VIEWPORTS["mobile"]
+    # 返回副本，改动不影响预设
+    viewports["mobile"]["height"] = 1
+    assert VIEWPORTS["mobile"]["height"] != 1
+
+
+def test_empty_items_are_ignored():
+    assert parse_viewports("desktop,,") == {"desktop": VIEWPORTS["desktop"]}
+    assert parse_viewports("") == {}
+
+
+@pytest.mark.parametrize("spec", ["phone", "1440x", "1440X900", "x900"])
+def test_unknown_viewport(spec):
+    with pytest.raises(ValueError):
+        parse_viewports(spec)
+
+
+def test_viewports_argument():
+    parser = argparse.ArgumentParser()
+    add_viewport_args(parser)
+    assert parser.parse_args([]).viewports is None
+    assert list(parser.parse_args(["--viewports", "tablet,mobile"]).viewports) == ["tablet", "mobile"]
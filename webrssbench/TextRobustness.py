@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+perturb_two_buttons.py  —  2025-07-23
+-------------------------------------
+需求：
+1) 遍历 input_root 下 easy/medium/hard/数字.html
+2) 每页随机选 2 个“可扰动”的按钮并确保文本确实被修改，否则整页记为失败
+3) 截图前后各一张：original.png / disturbed.png（另存带框的 annotated_before/after.png）
+4) 输出目录镜像输入结构：output_root/easy/数字/...
+5) 失败页记录到 failed_pages.csv（含难度、page_id、原因）
+
+用法：
+    python -m webrssbench.TextRobustness INPUT_ROOT OUTPUT_ROOT [--seed N]
+
+依赖：
+    pip install playwright tqdm pillow
+    playwright install chromium
+"""
+
+import os
+import csv
+import json
+import random
+import argparse
+import logging
+import traceback
+from pathlib import Path
+from datetime import datetime
+
+from webrssbench.annotate import draw_text_boxes
+from webrssbench.dedup import add_cluster_args, keep_page, load_cluster_map, page_key
+from webrssbench.discovery import add_discovery_args, discover
+from webrssbench.profiling import add_profiling_args, monitor_from_args, run_page, traced
+from webrssbench.seeding import add_seed_args, page_rng, resolve_run_seed, viewport_rngs
+from webrssbench.viewports import add_viewport_args, apply_viewport, fit_to_content
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────
+# 输入/输出根目录由命令行传入，见 main()
+LOG_FILE     = "run.log"
+FAILED_CSV   = "failed_pages.csv"
+
+NEED_BTN_NUM = 1       # 必须扰动的按钮数量=1
+RANDOM_SEED  = None    # 运行种子可设 int；None 时随机生成并写入日志
+SAVE_JSON    = True    # 是否保存每页元信息 JSON
+
+# ─── 文本扰动 ───────────────────────────────────────────────────────────────
+def advanced_perturb_text(text: str, rng=random) -> str:
+    """保证尽量变化；若策略都失败就在末尾加标记。"""
+    strategies = [
+        lambda s: s.replace('a', '@').replace('e', '3').replace('l', '1').replace('o', '0'),
+        lambda s: ''.join(rng.sample(s, len(s))) if len(s) > 3 else s,
+        lambda s: s[::-1],
+        lambda s: ' '.join(list(s)),
+        lambda s: 'Submit' if 'order' in s.lower() else s,
+        lambda s: s + '!' if not s.endswith('!') else s + '·',
+    ]
+    original = text
+    tried = set()
+    for _ in range(len(strategies)):
+        strat = rng.choice(strategies)
+        if strat in tried:
+            continue
+        tried.add(strat)
+        perturbed = strat(original)
+        if perturbed != original:
+            return perturbed
+    return original + '·'
+
+# ─── 工具函数 ───────────────────────────────────────────────────────────────
+def setup_logging(out_root: Path):
+    out_root.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        filename=out_root / LOG_FILE,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    console = logging.StreamHandler()
+    console.setLevel(logging.INFO)
+    logging.getLogger().addHandler(console)
+
+
+def find_html_files(root: Path, args=None):
+    """逐个产出 (diff, page_id, html_path)，不必等整棵树遍历完"""
+    for diff in ["easy", "medium", "hard"]:
+        diff_dir = root / diff
+        if not diff_dir.exists():
+            continue
+        for f in discover(diff_dir, args, ("*.html",), recursive=False):
+            yield diff, f.stem, f
+
+
+def draw_boxes(image_path: Path, boxes, save_path: Path):
+    # 样式见 annotate.TEXT_STYLE；离线重标注用同一套实现
+    draw_text_boxes(image_path, boxes, save_path)
+
+
+# ─── 核心处理 ───────────────────────────────────────────────────────────────
+COLLECT_BUTTONS_JS = """
+    () => {
+        const data = [];
+        document.querySelectorAll('button').forEach((btn, idx) => {
+            const rect = btn.getBoundingClientRect();
+            const plain = btn.childElementCount === 0;
+            const text  = btn.innerText.trim();
+            btn.setAttribute('data-btn-idx', idx);
+            data.push({
+                idx,
+                text,
+                is_plain: plain,
+                bbox: [rect.x, rect.y, rect.width, rect.height]
+            });
+        });
+        return data;
+    }
+"""
+
+SET_TEXT_JS = """
+    ([sel, key]) => {
+        sel.forEach(s => {
+            const btn = document.querySelector(`button[data-btn-idx="${s.idx}"]`);
+            if (btn) btn.innerText = s[key];
+        });
+    }
+"""
+
+
+def select_buttons(elements, need_btn_num: int = NEED_BTN_NUM, rng=random):
+    """从采集到的按钮中随机选 need_btn_num 个纯文本按钮并生成扰动文本；不满足时抛 RuntimeError。"""
+    candidates = [b for b in elements if b["is_plain"] and b["text"]]
+    if len(candidates) < need_btn_num:
+        raise RuntimeError(f"plain-text buttons < {need_btn_num}")
+
+    selected = rng.sample(candidates, need_btn_num)
+    selected.sort(key=lambda b: (b["bbox"][1], b["bbox"][0]))
+    for i, b in enumerate(selected, 1):
+        b["id"] = i
+
+    # 扰动并确保变化
+    for b in selected:
+        perturbed = advanced_perturb_text(b["text"], rng)
+        if perturbed == b["text"]:
+            raise RuntimeError("perturbation failed (no change)")
+        b["perturbed_text"] = perturbed
+    return selected
+
+
+def button_records(selected):
+    return [
+        {
+            "id": b["id"],
+            "idx": b["idx"],
+            "original_text": b["text"],
+            "perturbed_text": b["perturbed_text"],
+            "bounding_box": list(map(int, b["bbox"]))
+        } for b in selected
+    ]
+
+
+def capture_before_after(page, selected, page_out_dir: Path):
+    """截扰动前后两张图并画框；返回 (annotated_before, annotated_after)。页面文本会被恢复。
+
+    干净的 original.png / disturbed.png 会保留，供 ``webrssbench.annotate`` 离线重画。
+    """
+    # BEFORE
+    clean_before = page_out_dir / "original.png"
+    page.screenshot(path=str(clean_before), full_page=True)
+
+    annotated_before = page_out_dir / "annotated_before.png"
+    draw_boxes(clean_before, selected, annotated_before)
+
+    page.evaluate(SET_TEXT_JS, [selected, "perturbed_text"])
+
+    # AFTER
+    clean_after = page_out_dir / "disturbed.png"
+    page.screenshot(path=str(clean_after), full_page=True)
+
+    annotated_after = page_out_dir / "annotated_after.png"
+    draw_boxes(clean_after, selected, annotated_after)
+
+    # 恢复原文，供下一个视口使用
+    page.evaluate(SET_TEXT_JS, [selected, "text"])
+    return annotated_before, annotated_after
+
+
+def process_one_html(diff: str, page_id: str, html_path: Path, out_root: Path,
+                     need_btn_num: int = NEED_BTN_NUM, save_json: bool = SAVE_JSON,
+                     viewports=None, rng=random) -> bool:
+    """扰动单页。给定 viewports 时页面只加载一次，各视口输出到 out_root/<视口>/diff/page_id。
+    rng 为该页的随机流（见 seeding.page_rng）；各视口按名字分出自己的子流，独立选按钮。"""
+    from playwright.sync_api import sync_playwright
+
+    if viewports:
+        runs = {name: out_root / name / diff / page_id for name in viewports}
+        rngs = viewport_rngs(rng, viewports)
+    else:
+        runs = {None: out_root / diff / page_id}
+        rngs = {None: rng}
+    for page_out_dir in runs.values():
+        page_out_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch()
+            page    = browser.new_page()
+            with traced(page):
+                page.goto(f"file://{html_path.resolve()}")
+
+                for name, page_out_dir in runs.items():
+                    # 单视口：视口撑满整页；视口矩阵：保持预设尺寸，靠 full_page 截整页（与 position 一致）
+                    if name is None:
+                        fit_to_content(page, page.evaluate("() => document.documentElement.scrollWidth"))
+                    else:
+                        apply_viewport(page, viewports[name])
+
+                    # 采集按钮
+                    elements = page.evaluate(COLLECT_BUTTONS_JS)
+
+                    selected = select_buttons(elements, need_btn_num, rngs[name])
+
+                    annotated_before, annotated_after = capture_before_after(page, selected, page_out_dir)
+
+                    if save_json:
+                        meta = {
+                            "difficulty": diff,
+                            "page_id": page_id,
+                            "html_file": str(html_path),
+                            "original": str(page_out_dir / "original.png"),
+                            "disturbed": str(page_out_dir / "disturbed.png"),
+                            "annotated_before": str(annotated_before),
+                            "annotated_after": str(annotated_after),
+                            "selected_buttons": button_records(selected)
+                        }
+                        if name is not None:
+                            meta["viewport"] = {"name": name, **viewports[name]}
+                        with open(page_out_dir / "analysis_result.json", "w", encoding="utf-8") as f:
+                            json.dump(meta, f, indent=2, ensure_ascii=False)
+
+            browser.close()
+
+        logging.info(f"✓ {diff}/{page_id} done")
+        return True
+
+    except Exception as e:
+        logging.error(f"✗ {diff}/{page_id} failed: {e}")
+        logging.error(traceback.format_exc())
+        # 清理半成品
+        for page_out_dir in runs.values():
+            try:
+                for f in page_out_dir.glob("*"):
+                    f.unlink()
+                page_out_dir.rmdir()
+            except Exception:
+                pass
+        return False
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Perturb button text and capture before/after screenshots.")
+    parser.add_argument("input_root", type=Path, help="包含 easy/medium/hard 子目录的输入根目录")
+    parser.add_argument("output_root", type=Path, help="输出根目录")
+    parser.add_argument("--need-btn-num", type=int, default=NEED_BTN_NUM, help="每页必须扰动的按钮数量")
+    parser.add_argument("--no-json", dest="save_json", action="store_false", help="不保存每页元信息 JSON")
+    add_seed_args(parser, RANDOM_SEED)
+    add_cluster_args(parser)
+    add_discovery_args(parser)
+    add_viewport_args(parser)
+    add_profiling_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    out_root = args.output_root
+    setup_logging(out_root)
+    run_seed = resolve_run_seed(args.seed)
+
+    triples = find_html_files(args.input_root, args)
+    if args.clusters:
+        cluster_map, counts = load_cluster_map(args.clusters), {}
+        triples = (t for t in triples
+                   if keep_page(page_key(t[2], args.input_root), cluster_map, counts, args.per_cluster))
+
+    from tqdm import tqdm
+
+    failed_csv_path = out_root / FAILED_CSV
+    write_header = not failed_csv_path.exists()
+    failed_f = failed_csv_path.open("a", newline="", encoding="utf-8-sig")
+    failed_writer = csv.writer(failed_f)
+    if write_header:
+        failed_writer.writerow(["difficulty", "page_id", "html_path", "reason"])
+        failed_f.flush()
+
+    monitor = monitor_from_args(args, out_root)
+    total = ok = 0
+    with tqdm(triples, desc="HTML pages", unit="page") as bar:
+        for diff, page_id, html_path in bar:
+            total += 1
+            bar.set_postfix_str(page_id)
+            # 与其他脚本相同：相对输入根目录的路径（含扩展名）
+            key = html_path.relative_to(args.input_root).as_posix()
+            if run_page(monitor, key, process_one_html, diff, page_id, html_path, out_root,
+                        need_btn_num=args.need_btn_num, save_json=args.save_json,
+                        viewports=args.viewports, rng=page_rng(run_seed, key), output_arg="out_root"):
+                ok += 1
+            else:
+                failed_writer.writerow([diff, page_id, str(html_path), "perturb_fail_or_exception"])
+                failed_f.flush()
+
+    failed_f.close()
+    if not total:
+        logging.error("No HTML files found. Check input_root.")
+        return
+    logging.info(f"Completed: {ok}/{total} succeed. Failed list -> {failed_csv_path}")
+    print(f"✔ Done. Success {ok}/{total}. Failed CSV: {failed_csv_path}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
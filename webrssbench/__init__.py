@@ -0,0 +1,5 @@
+"""WebRSSBench: position labelling plus color, text and layout robustness perturbations.
+
+Submodules are import-safe: heavy dependencies (Playwright, PIL, bs4, tkinter)
+are only imported inside the functions that use them.
+"""
@@ -0,0 +1,190 @@
+"""
+Box annotation shared by the render scripts, plus an offline re-annotation command.
+
+The scripts draw their annotated images through these helpers, and the same
+helpers rebuild them later from the stored clean renders and
+``analysis_result.json``. No browser is involved:
+    TextRobustness  original/disturbed.png  → annotated_before/after.png
+    position        random_crops/original.png → layout_with_boxes.png, crop_<id>.png
+    pipeline        the same, under text/ and position/random_crops/
+
+用法：
+    python -m webrssbench.annotate OUTPUT_ROOT [--color blue] [--label-offset 24] [--workers N]
+"""
+
+import json
+import logging
+import argparse
+from pathlib import Path
+from functools import partial
+
+META_NAME = "analysis_result.json"
+BATCH_SIZE = 16
+
+# TextRobustness 的标注样式
+TEXT_STYLE = {"color": "red", "width": 3, "font": "arial.ttf", "font_size": 18, "label_offset": 20}
+# position.py 的标注样式（默认字体，标签画在框内左上角）
+LAYOUT_STYLE = {"color": "red", "width": 2, "font": None, "font_size": 10, "label_offset": 0}
+
+
+def load_font(name=None, size=10):
+    from PIL import ImageFont
+
+    if name:
+        try:
+            return ImageFont.truetype(name, size)
+        except Exception:
+            pass
+    return ImageFont.load_default()
+
+
+def draw_labeled_boxes(img, boxes, color="red", width=2, font=None, font_size=10, label_offset=0):
+    """Draw ``(x, y, w, h, label)`` boxes on ``img`` in place; empty boxes are skipped."""
+    from PIL import ImageDraw
+
+    draw = ImageDraw.Draw(img)
+    pil_font = load_font(font, font_size)
+    for x, y, w, h, label in boxes:
+        if w <= 0 or h <= 0:
+            continue
+        draw.rectangle([(x, y), (x + w, y + h)], outline=color, width=width)
+        draw.text((x, max(0, y - label_offset)), str(label), fill=color, font=pil_font)
+    return img
+
+
+def draw_text_boxes(image_path, boxes, save_path, **style):
+    """TextRobustness 样式：boxes 为 ``[{"bbox": [x, y, w, h], "id": ...}]``。"""
+    from PIL import Image
+
+    style = {**TEXT_STYLE, **style}
+    with Image.open(image_path) as img:
+        img = img.copy()
+    labeled = [(*map(int, b["bbox"]), b["id"]) for b in boxes]
+    draw_labeled_boxes(img, labeled, **style).save(save_path)
+
+
+def draw_layout_boxes(clean_image, boxes, **style):
+    """position 样式：boxes 为 ``[{"box": {x, y, width, height}, "id": ...}]``（像素坐标），返回新图。"""
+    style = {**LAYOUT_STYLE, **style}
+    labeled = [(b["box"]["x"], b["box"]["y"], b["box"]["width"], b["box"]["height"], b["id"]) for b in boxes]
+    return draw_labeled_boxes(clean_image.copy(), labeled, **style)
+
+
+def crop_box(clean_image, box):
+    x, y, w, h = map(int, (box['x'], box['y'], box['width'], box['height']))
+    return clean_image.crop((x, y, x + w, y + h))
+
+
+# ─── 离线重标注 ─────────────────────────────────────────────────────────────
+def annotate_text_page(page_dir: Path, meta: dict, before=None, after=None, **style) -> bool:
+    """``before`` / ``after`` default to ``page_dir``'s original/disturbed.png; output goes to ``page_dir``."""
+    before = before or page_dir / "original.png"
+    after = after or page_dir / "disturbed.png"
+    if not (before.exists() and after.exists()):
+        return False
+    boxes = [{"bbox": b["bounding_box"], "id": b["id"]} for b in meta["selected_buttons"]]
+    draw_text_boxes(before, boxes, page_dir / "annotated_before.png", **style)
+    draw_text_boxes(after, boxes, page_dir / "annotated_after.png", **style)
+    return True
+
+
+def annotate_position_page(page_dir: Path, meta: dict, **style) -> bool:
+    from PIL import Image
+
+    crop_folder = page_dir / "random_crops"
+    clean_path = crop_folder / "original.png"
+    if not clean_path.exists():
+        return False
+    with Image.open(clean_path) as img:
+        clean_image = img.convert("RGB")
+
+    # 元数据里的框是按整页宽高归一化的
+    total_width, total_height = meta["elements"].get("page_size") or clean_image.size
+    selected = []
+    for block in meta["elements"].get("selected_blocks", []):
+        b = block["box"]
+        selected.append({"id": block["id"], "box": {
+            "x": round(b["x"] * total_width, 3),
+            "y": round(b["y"] * total_height, 3),
+            "width": round(b["width"] * total_width, 3),
+            "height": round(b["height"] * total_height, 3),
+        }})
+
+    for block in selected:
+        crop_box(clean_image, block["box"]).save(crop_folder / f"crop_{block['id']}.png")
+    draw_layout_boxes(clean_image, selected, **style).save(crop_folder / "layout_with_boxes.png")
+    return True
+
+
+def annotate_pipeline_page(page_dir: Path, meta: dict, **style) -> bool:
+    """pipeline 记录：text 阶段共用页面的 original.png，position 的裁剪在 position/random_crops 下。"""
+    done = False
+    text = meta.get("text")
+    if isinstance(text, dict) and "selected_buttons" in text:
+        done |= annotate_text_page(page_dir / "text", text, before=page_dir / meta.get("original", "original.png"),
+                                   after=page_dir / text["disturbed"], **style)
+    elements = meta.get("position")
+    if isinstance(elements, dict) and "error" not in elements:
+        done |= annotate_position_page(page_dir / "position", {"elements": elements}, **style)
+    return done
+
+
+def annotate_page(meta_path, style=None) -> bool:
+    """Rebuild one page's annotated images; returns False if the page has nothing to rebuild."""
+    meta_path = Path(meta_path)
+    style = style or {}
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if isinstance(meta.get("text"), dict) or isinstance(meta.get("position"), dict):
+            return annotate_pipeline_page(meta_path.parent, meta, **style)
+        if "selected_buttons" in meta:
+            return annotate_text_page(meta_path.parent, meta, **style)
+        if "elements" in meta:
+            return annotate_position_page(meta_path.parent, meta, **style)
+    except Exception as e:
+        logging.error("annotate failed for %s: %s", meta_path.parent, e)
+    return False
+
+
+def annotate_tree(root: Path, style=None, workers=None, batch_size: int = BATCH_SIZE):
+    metas = sorted(root.rglob(META_NAME))
+    job = partial(annotate_page, style=style)
+    if workers == 1:
+        yield from map(job, metas)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(job, metas, chunksize=batch_size)
+
+
+# ─── MAIN ──────────────────────────────────────────────────────────────────
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild annotated images and crops from stored renders, without a browser.")
+    parser.add_argument("output_root", type=Path, help="TextRobustness、position 或 pipeline 的输出根目录")
+    parser.add_argument("--color", help="框和标签颜色")
+    parser.add_argument("--box-width", dest="width", type=int, help="框线宽")
+    parser.add_argument("--font", help="TrueType 字体文件；缺省用 PIL 默认字体")
+    parser.add_argument("--font-size", type=int)
+    parser.add_argument("--label-offset", type=int, help="标签相对框上沿的偏移（像素）")
+    parser.add_argument("--workers", type=int, default=None, help="进程数；1 表示不用进程池")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    style = {k: v for k, v in vars(args).items()
+             if k in ("color", "width", "font", "font_size", "label_offset") and v is not None}
+    total = done = 0
+    for ok in annotate_tree(args.output_root, style, args.workers, args.batch_size):
+        total += 1
+        done += ok
+    logging.info("✔ Re-annotated %d/%d pages under %s", done, total, args.output_root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+DISTURB_LEVEL = "high"
+MIN_AREA      = 50
+RETRIES       = 2      # 重新上色后截图仍看不出变化时的重试次数
+MAX_HEIGHT    = 5500   # 页面高度超过该值时跳过截图并删除
+
+LEVEL_PROB = {"low": 0.10, "medium": 0.30, "high": 0.40}
+STRONG_COLORS = [
+    "red", "blue", "green", "yellow", "purple", "orange",
+    "#00ffff", "#ff00ff", "#ff6600", "#00ff00", "#0099ff"
+]
+
+SELECTOR_LIST = [
+    "button", "input[type=button]", "input[type=submit]", "input[type=reset]",
+    "[role=button]", ".button"
+]
+
+import random, re, json, pathlib, logging, shutil, argparse
+
+from webrssbench.dedup import add_cluster_args, filter_paths, load_cluster_map
+from webrssbench.discovery import add_discovery_args, discover
+from webrssbench.profiling import add_profiling_args, monitor_from_args, run_page, traced
+from webrssbench.seeding import add_seed_args, page_rng, resolve_run_seed, viewport_rngs
+from webrssbench.viewports import add_viewport_args, apply_viewport, fit_to_content
+
+BUTTON_RECTS_JS = """
+    sels => Array.from(document.querySelectorAll(sels.join(','))).map(btn => {
+        const r = btn.getBoundingClientRect();
+        return {x: r.x, y: r.y, width: r.width, height: r.height};
+    })
+"""
+
+def find_all_buttons(soup):
+    candidates = []
+    for tag in soup.find_all(True):
+        if tag.name == "button":
+            candidates.append(tag)
+        elif tag.name == "input" and tag.get("type", "").lower() in {"button", "submit", "reset"}:
+            candidates.append(tag)
+        elif "button" in tag.get("class", []):
+            candidates.append(tag)
+        elif tag.get("role") == "button":
+            candidates.append(tag)
+    return candidates
+
+def recolor_html(html_source: str, sizes: list, prob: float = LEVEL_PROB[DISTURB_LEVEL], min_area: int = MIN_AREA,
+                 rng=random):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_source, "html.parser")
+    buttons = find_all_buttons(soup)
+
+    recolored = choose_recolors(sizes[:len(buttons)], prob, min_area, rng)
+    for r in recolored:
+        btn = buttons[r["idx"]]
+        btn["style"] = restyle(btn.get("style", ""), r["color"])
+    return str(soup), recolored, len(buttons)
+
+def choose_recolors(sizes: list, prob: float = LEVEL_PROB[DISTURB_LEVEL], min_area: int = MIN_AREA,
+                    rng=random):
+    """用 rng 随机决定要上色的按钮：返回 ``[{"idx", "color", "bbox"}]``。"""
+    indices = list(range(len(sizes)))
+    rng.shuffle(indices)
+
+    recolored = []
+    for idx in indices:
+        size = sizes[idx]
+        area = size["width"] * size["height"]
+        if area < min_area:
+            continue
+        if rng.random() <= prob:
+            colour = rng.choice(STRONG_COLORS)
+            recolored.append({"idx": idx, "color": colour,
+                              "bbox": [size["x"], size["y"], size["width"], size["height"]]})
+    return recolored
+
+def restyle(style: str, colour: str) -> str:
+    """去掉原有背景声明，追加新的 background-color。"""
+    style  = re.sub(r"background(?:-color)?\s*:\s*[^;]+;?", "", style or "", flags=re.I)
+    if style and not style.strip().endswith(";"):
+        style += ";"
+    return style + f"background-color:{colour};"
+
+def safe_screenshot(html_path: pathlib.Path, png_path: pathlib.Path, out_dir: pathlib.Path, difficulty: str, html_stem: str,
+                    selector_list: list = SELECTOR_LIST):
+    """视口撑满内容后整页截图；返回 ``(按钮框列表, html_source)``，失败返回 None。
+
+    按钮框在截图的同一会话、同一视口下测量，坐标与截图一致。
+    """
+    from playwright.sync_api import sync_playwright
+
+    try:
+        html_url = f"file:///{html_path.as_posix()}"
+        with sync_playwright() as p:
+            br = p.chromium.launch()
+            pg = br.new_page()
+            with traced(pg):
+                pg.goto(html_url)
+                html_source = pg.content()
+
+                w = pg.evaluate("() => document.documentElement.scrollWidth")
+                h = pg.evaluate("() => document.documentElement.scrollHeight")
+
+                if h > MAX_HEIGHT:
+                    logging.warning("🚮 页面高度过大，跳过截图并删除: %s/%s (%d px)", difficulty, html_stem, h)
+                    shutil.rmtree(out_dir)
+                    return None     # 退出 sync_playwright 时关闭浏览器，trace 先保存
+
+                fit_to_content(pg, w)
+                rects = pg.evaluate(BUTTON_RECTS_JS, selector_list)
+                pg.screenshot(path=str(png_path), full_page=True)
+            br.close()
+        return rects, html_source
+    except Exception as e:
+        logging.error("❌ 截图失败: %s/%s %s", difficulty, html_stem, str(e))
+        shutil.rmtree(out_dir)
+        return None
+
+def render_viewports(html_path: pathlib.Path, shots: dict, viewports: dict, selector_list: list):
+    """页面只加载一次，依次按各视口整页截图到 ``shots[name]``。
+
+    返回 ``({name: 按钮框列表；页面过高未截图则为 None}, html_source)``。
+    """
+    from playwright.sync_api import sync_playwright
+
+    html_url = f"file:///{html_path.as_posix()}"
+    rects = {}
+    with sync_playwright() as p:
+        br = p.chromium.launch()
+        pg = br.new_page()
+        with traced(pg):
+            pg.goto(html_url)
+            html_source = pg.content()
+
+            for name, size in viewports.items():
+                apply_viewport(pg, size)
+                h = pg.evaluate("() => document.documentElement.scrollHeight")
+                if h > MAX_HEIGHT:
+                    logging.warning("🚮 页面高度过大，跳过截图: %s @%s (%d px)", html_path.name, name, h)
+                    rects[name] = None
+                    continue
+                # 保持预设视口高度，full_page 截整页，与 position / layoutRobustness 一致
+                rects[name] = pg.evaluate(BUTTON_RECTS_JS, selector_list)
+                pg.screenshot(path=str(shots[name]), full_page=True)
+        br.close()
+    return rects, html_source
+
+def process_page_matrix(html: pathlib.Path, parent_dir: pathlib.Path, output_dir: pathlib.Path, viewports: dict,
+                        level: str = DISTURB_LEVEL, min_area: int = MIN_AREA, retries: int = RETRIES,
+                        rng=random):
+    """视口矩阵版 process_page：原页只加载一次，输出到 output_dir/<视口>/difficulty/stem。
+
+    每个视口用自己的随机子流（见 seeding.viewport_rngs）按本视口的按钮框上色并单独截扰动页，
+    结果与同时选了哪些视口无关。返回各视口上色按钮数之和。
+    """
+    from webrssbench.verify import verify_page
+
+    relative_path = html.relative_to(parent_dir)
+    difficulty = relative_path.parts[0]
+    html_stem = html.stem
+
+    out_dirs = {name: output_dir / name / difficulty / html_stem for name in viewports}
+    for out_dir in out_dirs.values():
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        orig_rects, html_source = render_viewports(
+            html, {n: d / "original.png" for n, d in out_dirs.items()}, viewports, SELECTOR_LIST)
+        for name in [n for n, r in orig_rects.items() if r is None]:
+            shutil.rmtree(out_dirs.pop(name))
+        if not out_dirs:
+            return None
+        rngs = viewport_rngs(rng, viewports)
+
+        hits = 0
+        for name, out_dir in list(out_dirs.items()):
+            for attempt in range(retries + 1):
+                disturbed_html, recolored, total = recolor_html(
+                    html_source, orig_rects[name], LEVEL_PROB[level], min_area, rngs[name])
+                (out_dir / "disturbed.html").write_text(disturbed_html, encoding="utf-8")
+
+                dist_rects, _ = render_viewports(out_dir / "disturbed.html", {name: out_dir / "disturbed.png"},
+                                                 {name: viewports[name]}, SELECTOR_LIST)
+                rects = dist_rects[name]
+                if rects is None:
+                    shutil.rmtree(out_dirs.pop(name))
+                    break
+                meta = {
+                    "difficulty": difficulty,
+                    "page_id": html_stem,
+                    "html_file": str(html),
+                    "level": level,
+                    "viewport": {"name": name, **viewports[name]},
+                    "original": str(out_dir / "original.png"),
+                    "disturbed": str(out_dir / "disturbed.png"),
+                    "total_buttons": total,
+                    "recolored_buttons": [
+                        {**r, "bbox": ([rects[r["idx"]][k] for k in ("x", "y", "width", "height")]
+                                       if r["idx"] < len(rects) else r["bbox"])}
+                        for r in recolored
+                    ],
+                }
+                meta_path = out_dir / "analysis_result.json"
+                with open(meta_path, "w", encoding="utf-8") as f:
+                    json.dump(meta, f, indent=2, ensure_ascii=False)
+
+                if not recolored or verify_page(meta_path)["effective"]:
+                    hits += len(recolored)
+                    if recolored:
+                        logging.info("[%s/%s]: recoloured %d / %d buttons at %s (level %s, min area %d)",
+                                     difficulty, html_stem, len(recolored), total, name, level, min_area)
+                    break
+                logging.warning("🔁 [%s/%s @%s]: recolour not visible (attempt %d/%d)",
+                                difficulty, html_stem, name, attempt + 1, retries + 1)
+            else:
+                logging.warning("⚠️ [%s/%s @%s]: recolour never visible, rejected", difficulty, html_stem, name)
+                shutil.rmtree(out_dirs.pop(name))
+
+        if not out_dirs:
+            return None
+        return hits
+    except Exception as e:
+        logging.error("❌ 处理失败: %s/%s %s", difficulty, html_stem, str(e))
+        for out_dir in out_dirs.values():
+            shutil.rmtree(out_dir, ignore_errors=True)
+        return None
+
+def process_page(html: pathlib.Path, parent_dir: pathlib.Path, output_dir: pathlib.Path,
+                 level: str = DISTURB_LEVEL, min_area: int = MIN_AREA, retries: int = RETRIES,
+                 rng=random):
+    """处理单个页面；返回扰动的按钮数，截图或处理失败返回 None。
+
+    新背景色被 CSS 覆盖、截图看不出变化时，重新随机上色最多 ``retries`` 次；重试继续消耗同一个 rng，结果仍可复现。
+    """
+    from webrssbench.verify import verify_page
+
+    relative_path = html.relative_to(parent_dir)
+    difficulty = relative_path.parts[0]
+    html_stem = html.stem
+
+    out_dir  = output_dir / difficulty / html_stem
+    orig_png = out_dir / "original.png"
+    dist_png = out_dir / "disturbed.png"
+    disturbed_html_path = out_dir / "disturbed.html"
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        # 原始截图，按钮框在同一视口下测量
+        shot = safe_screenshot(html, orig_png, out_dir, difficulty, html_stem)
+        if shot is None:
+            return None
+        sizes, html_source = shot
+
+        for attempt in range(retries + 1):
+            # 干扰
+            disturbed_html, recolored, total = recolor_html(html_source, sizes, LEVEL_PROB[level], min_area, rng)
+            disturbed_html_path.write_text(disturbed_html, encoding="utf-8")
+
+            if safe_screenshot(disturbed_html_path, dist_png, out_dir, difficulty, html_stem) is None:
+                return None
+
+            meta = {
+                "difficulty": difficulty,
+                "page_id": html_stem,
+                "html_file": str(html),
+                "level": level,
+                "original": str(orig_png),
+                "disturbed": str(dist_png),
+                "total_buttons": total,
+                "recolored_buttons": recolored,
+            }
+            meta_path = out_dir / "analysis_result.json"
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2, ensure_ascii=False)
+
+            if not recolored or verify_page(meta_path)["effective"]:
+                break
+            logging.warning("🔁 [%s/%s]: recolour not visible (attempt %d/%d)",
+                            difficulty, html_stem, attempt + 1, retries + 1)
+        else:
+            logging.warning("⚠️ [%s/%s]: recolour never visible, rejected", difficulty, html_stem)
+            shutil.rmtree(out_dir)
+            return None
+
+        hits = len(recolored)
+        if hits:
+            logging.info("[%s/%s]: recoloured %d / %d buttons (level %s, min area %d)",
+                         difficulty, html_stem, hits, total, level, min_area)
+        return hits
+    except Exception as e:
+        logging.error("❌ 处理失败: %s/%s %s", difficulty, html_stem, str(e))
+        shutil.rmtree(out_dir)
+        return None
+
+# ─── MAIN ──────────────────────────────────────────────────────────────────
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Recolour buttons and capture original/disturbed screenshots.")
+    parser.add_argument("parent_dir", type=pathlib.Path, help="输入根目录（第一级子目录为难度）")
+    parser.add_argument("output_dir", type=pathlib.Path, help="输出根目录")
+    parser.add_argument("--level", choices=sorted(LEVEL_PROB), default=DISTURB_LEVEL, help="扰动强度")
+    parser.add_argument("--min-area", type=int, default=MIN_AREA, help="参与扰动的按钮最小面积")
+    parser.add_argument("--retries", type=int, default=RETRIES, help="上色无可见变化时的重试次数")
+    add_seed_args(parser)
+    add_cluster_args(parser)
+    add_discovery_args(parser)
+    add_viewport_args(parser)
+    add_profiling_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    run_seed = resolve_run_seed(args.seed)
+
+    files = discover(args.parent_dir, args, ("*.htm*",))
+    if args.clusters:
+        files = filter_paths(files, args.parent_dir, load_cluster_map(args.clusters), args.per_cluster)
+
+    failed_pages = []
+    monitor = monitor_from_args(args, args.output_dir)
+
+    total = 0
+    for html in files:
+        total += 1
+        key = html.relative_to(args.parent_dir).as_posix()
+        if args.viewports:
+            hits = run_page(monitor, key, process_page_matrix, html, args.parent_dir, args.output_dir,
+                            args.viewports, args.level, args.min_area, args.retries, page_rng(run_seed, key),
+                            output_arg="output_dir")
+        else:
+            hits = run_page(monitor, key, process_page, html, args.parent_dir, args.output_dir,
+                            args.level, args.min_area, args.retries, page_rng(run_seed, key),
+                            output_arg="output_dir")
+        if hits == 0:
+            relative_path = html.relative_to(args.parent_dir)
+            failed_pages.append(f"{relative_path.parts[0]}/{html.stem}")
+
+    logging.info("✔ All %d pages processed → %s", total, args.output_dir)
+
+    if failed_pages:
+        logging.warning("⚠️ No buttons disturbed in:")
+        for page in failed_pages:
+            logging.warning(" - %s", page)
+    else:
+        logging.info("🎉 All pages have at least 1 disturbed button.")
+
+
+if __name__ == "__main__":
+    main()
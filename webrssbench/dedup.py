@@ -0,0 +1,334 @@
+"""
+Near-duplicate detection across the HTML corpus and its original renders.
+
+Each page gets a 64-bit structural simhash of its DOM (tag/depth shingles, text
+ignored) and, when a render exists, a 64-bit difference hash of the image.
+Pages are linked when both hashes are within their hamming thresholds; linked
+pages form clusters (union-find). A page without a render is only linked to
+other pages without one, so it cannot bridge two renders that look different.
+Candidate pairs come from a multi-index lookup over the DOM hash, so
+clustering never compares all pairs.
+
+用法：
+    python -m webrssbench.dedup INPUT_DIR clusters.json [--renders OUTPUT_DIR]
+
+The exported map can be passed to the other scripts with
+``--clusters clusters.json [--per-cluster N]``.
+"""
+
+import json
+import hashlib
+import logging
+import argparse
+from pathlib import Path
+from html.parser import HTMLParser
+
+from webrssbench.discovery import add_discovery_args, discover
+
+HASH_BITS      = 64
+DOM_THRESHOLD  = 3      # 结构哈希最大汉明距离
+PHASH_THRESHOLD = 6     # 渲染图哈希最大汉明距离
+SHINGLE_SIZE   = 3
+BATCH_SIZE     = 64     # 每个 worker 一次处理的页面数
+RENDER_NAME    = "original.png"
+# 各脚本输出里渲染图的位置：镜像输入目录（color / TextRobustness / pipeline）或平铺
+# （layoutRobustness / position），position 的整页图在 random_crops 下
+RENDER_SUBDIRS = ("", "random_crops")
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+}
+
+
+# ─── 哈希 ───────────────────────────────────────────────────────────────────
+class _TagCollector(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.tokens = []
+        self.depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        self.tokens.append(f"{self.depth}:{tag}")
+        if tag not in VOID_TAGS:
+            self.depth += 1
+
+    def handle_endtag(self, tag):
+        if tag not in VOID_TAGS:
+            self.depth = max(0, self.depth - 1)
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(tokens) -> int:
+    counts = [0] * HASH_BITS
+    for token in tokens:
+        h = _token_hash(token)
+        for bit in range(HASH_BITS):
+            counts[bit] += 1 if h >> bit & 1 else -1
+    value = 0
+    for bit, c in enumerate(counts):
+        if c > 0:
+            value |= 1 << bit
+    return value
+
+
+def dom_hash(html: str, shingle_size: int = SHINGLE_SIZE) -> int:
+    """Structural simhash of a document; text and attribute values are ignored."""
+    collector = _TagCollector()
+    collector.feed(html)
+    collector.close()
+    tokens = collector.tokens
+    if len(tokens) <= shingle_size:
+        return simhash([" ".join(tokens)])
+    return simhash(" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1))
+
+
+def image_hash(png_path: Path) -> int:
+    """64-bit difference hash (dHash) of an image."""
+    from PIL import Image
+
+    with Image.open(png_path) as img:
+        # 只解码缩略图需要的分辨率
+        img.draft("L", (64, 64))
+        small = img.convert("L").resize((9, 8), Image.BILINEAR)
+    px = list(small.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = value << 1 | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _hash_page(job):
+    key, html_path, render_path = job
+    try:
+        d = dom_hash(Path(html_path).read_text("utf-8", errors="ignore"))
+    except Exception as e:
+        logging.warning("dom hash failed for %s: %s", key, e)
+        return key, None, None
+    p = None
+    if render_path is not None:
+        try:
+            p = image_hash(Path(render_path))
+        except Exception as e:
+            logging.warning("image hash failed for %s: %s", key, e)
+    return key, d, p
+
+
+def compute_hashes(jobs, workers=None, batch_size: int = BATCH_SIZE):
+    """Hash ``(key, html_path, render_path_or_None)`` jobs in batches across a process pool.
+
+    Returns ``{key: (dom_hash, image_hash_or_None)}``; pages that cannot be read are omitted.
+    """
+    hashes = {}
+    if workers == 1:
+        results = map(_hash_page, jobs)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_hash_page, jobs, chunksize=batch_size)
+    try:
+        for key, d, p in results:
+            if d is not None:
+                hashes[key] = (d, p)
+    finally:
+        if workers != 1:
+            pool.shutdown()
+    return hashes
+
+
+# ─── 多索引汉明查找 ─────────────────────────────────────────────────────────
+class MultiIndexHash:
+    """Exact hamming-radius lookup over 64-bit hashes.
+
+    The hash is split into ``threshold + 1`` segments; by pigeonhole any hash
+    within ``threshold`` bits agrees exactly on at least one segment, so only
+    bucket-mates need a full distance check.
+    """
+
+    def __init__(self, threshold: int, bits: int = HASH_BITS):
+        self.threshold = threshold
+        n = min(threshold + 1, bits)
+        base, extra = divmod(bits, n)
+        self.segments = []
+        shift = 0
+        for i in range(n):
+            width = base + (1 if i < extra else 0)
+            self.segments.append((shift, (1 << width) - 1))
+            shift += width
+        self.tables = [{} for _ in self.segments]
+        self.values = {}
+
+    def add(self, key, value: int):
+        self.values[key] = value
+        for table, (shift, mask) in zip(self.tables, self.segments):
+            table.setdefault(value >> shift & mask, []).append(key)
+
+    def query(self, value: int):
+        seen = set()
+        for table, (shift, mask) in zip(self.tables, self.segments):
+            for key in table.get(value >> shift & mask, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                if hamming(value, self.values[key]) <= self.threshold:
+                    yield key
+
+
+# ─── 聚类 ───────────────────────────────────────────────────────────────────
+def cluster_pages(hashes: dict, dom_threshold: int = DOM_THRESHOLD, phash_threshold: int = PHASH_THRESHOLD):
+    """Group near-duplicate pages. Returns a list of sorted member lists, largest first."""
+    parent = {key: key for key in hashes}
+
+    def find(k):
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    index = MultiIndexHash(dom_threshold)
+    for key in sorted(hashes):
+        d, p = hashes[key]
+        for other in index.query(d):
+            op = hashes[other][1]
+            # 有渲染图的只和有渲染图的相连，且外观必须相近；没有的只和没有的相连
+            if (p is None) != (op is None):
+                continue
+            if p is not None and hamming(p, op) > phash_threshold:
+                continue
+            ra, rb = find(key), find(other)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+        index.add(key, d)
+
+    groups = {}
+    for key in hashes:
+        groups.setdefault(find(key), []).append(key)
+    return sorted((sorted(m) for m in groups.values()), key=lambda m: (-len(m), m[0]))
+
+
+def build_cluster_map(clusters, hashes: dict) -> dict:
+    page_to_cluster = {}
+    out = []
+    for cid, members in enumerate(clusters):
+        for key in members:
+            page_to_cluster[key] = cid
+        out.append({"id": cid, "representative": members[0], "members": members})
+    return {
+        "pages": len(page_to_cluster),
+        "clusters": out,
+        "page_to_cluster": page_to_cluster,
+        "hashes": {k: {"dom": f"{d:016x}", "image": None if p is None else f"{p:016x}"}
+                   for k, (d, p) in sorted(hashes.items())},
+    }
+
+
+# ─── 给各流水线用的过滤 ─────────────────────────────────────────────────────
+def load_cluster_map(path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def page_key(html_path, root) -> str:
+    return Path(html_path).resolve().relative_to(Path(root).resolve()).as_posix()
+
+
+def keep_page(key: str, cluster_map: dict, counts: dict, per_cluster: int = 1) -> bool:
+    """True if ``key`` should be processed; pages missing from the map are always kept.
+
+    Each cluster's exported ``representative`` is always kept, whatever order it
+    arrives in; one of the ``per_cluster`` slots stays reserved for it.
+    """
+    cid = cluster_map["page_to_cluster"].get(key)
+    if cid is None:
+        return True
+    kept, rep_kept = counts.get(cid, (0, False))
+    if key == cluster_map["clusters"][cid]["representative"]:
+        counts[cid] = (kept + 1, True)
+        return True
+    if kept + (0 if rep_kept else 1) >= per_cluster:
+        return False
+    counts[cid] = (kept + 1, rep_kept)
+    return True
+
+
+def filter_paths(paths, root, cluster_map: dict, per_cluster: int = 1):
+    """Lazily keep at most ``per_cluster`` pages per cluster (its representative included), in the order given."""
+    counts = {}
+    return (p for p in paths if keep_page(page_key(p, root), cluster_map, counts, per_cluster))
+
+
+def add_cluster_args(parser):
+    parser.add_argument("--clusters", type=Path, help="dedup 导出的聚类 JSON；每个聚类只处理少量页面")
+    parser.add_argument("--per-cluster", type=int, default=1, help="每个聚类最多处理的页面数")
+
+
+# ─── MAIN ──────────────────────────────────────────────────────────────────
+def find_render(renders_dir: Path, rel: Path, render_name: str = RENDER_NAME):
+    """Render of ``rel`` in any script's output layout under ``renders_dir``, or ``None``."""
+    for base in (renders_dir / rel.parent / rel.stem, renders_dir / rel.stem):
+        for sub in RENDER_SUBDIRS:
+            candidate = base / sub / render_name
+            if candidate.exists():
+                return candidate
+    return None
+
+
+def find_jobs(input_dir: Path, renders_dir=None, render_name: str = RENDER_NAME, args=None):
+    for html in discover(input_dir, args, ("*.htm*",)):
+        rel = html.relative_to(input_dir)
+        render = None
+        if renders_dir is not None:
+            found = find_render(renders_dir, rel, render_name)
+            render = None if found is None else str(found)
+        yield rel.as_posix(), str(html), render
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate HTML pages by DOM structure and render.")
+    parser.add_argument("input_dir", type=Path, help="HTML 输入根目录")
+    parser.add_argument("output", type=Path, help="导出的聚类 JSON 路径")
+    parser.add_argument("--renders", type=Path, help="任一脚本已有渲染图的输出根目录（<相对目录>/<stem>/original.png 等）")
+    parser.add_argument("--render-name", default=RENDER_NAME, help="渲染图文件名")
+    parser.add_argument("--dom-threshold", type=int, default=DOM_THRESHOLD)
+    parser.add_argument("--phash-threshold", type=int, default=PHASH_THRESHOLD)
+    parser.add_argument("--workers", type=int, default=None, help="进程数；1 表示不用进程池")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    add_discovery_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    input_dir = args.input_dir.resolve()
+    jobs = find_jobs(input_dir, args.renders, args.render_name, args)
+    hashes = compute_hashes(jobs, args.workers, args.batch_size)
+    if args.renders:
+        missing = sum(p is None for _, p in hashes.values())
+        if missing:
+            logging.warning("%d/%d pages have no render under %s; they are clustered by DOM only, among themselves",
+                            missing, len(hashes), args.renders)
+    clusters = cluster_pages(hashes, args.dom_threshold, args.phash_threshold)
+
+    cluster_map = build_cluster_map(clusters, hashes)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(cluster_map, f, indent=2, ensure_ascii=False)
+
+    dup = sum(len(m) - 1 for m in clusters)
+    logging.info("%d pages → %d clusters (%d near-duplicates) → %s",
+                 len(hashes), len(clusters), dup, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Streaming corpus discovery with an optional persistent file index.
+
+``iter_html_files`` walks the tree with ``os.scandir`` and yields each match
+as soon as its directory is read, so processing starts before the walk ends.
+Entries are visited in name order, so the output is deterministic.
+
+With ``--index PATH`` a SQLite index keeps (path, size, mtime, hash) for every
+``*.htm*`` file plus each directory's mtime and subdirectories, keyed by the
+resolved root so it does not depend on the working directory. On later runs a
+directory whose mtime is unchanged is served from the index without listing
+or stat-ing its files, and only changed directories are re-read. A file edited
+in place does not change its directory's mtime; use ``--rescan`` to re-stat
+everything. Paths are yielded while a directory is being read; content
+hashes are computed lazily (``lookup`` / ``fill_hashes``), never on the walk.
+
+用法：
+    python -m webrssbench.discovery ROOT [--index corpus.sqlite] [--pattern '*.html']
+"""
+
+import os
+import json
+import hashlib
+import argparse
+from fnmatch import fnmatch
+from pathlib import Path
+
+HTML_PATTERNS = ("*.html", "*.htm")
+INDEX_PATTERN = "*.htm*"      # 索引里记录的文件范围，各脚本的模式都是它的子集
+HASH_CHUNK = 1 << 20
+
+
+def file_hash(path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _matches(name: str, patterns) -> bool:
+    name = name.lower()
+    return any(fnmatch(name, p) for p in patterns)
+
+
+class FileIndex:
+    """SQLite-backed record of the corpus tree."""
+
+    def __init__(self, path, with_hash: bool = True):
+        import sqlite3
+
+        self.with_hash = with_hash
+        self.db = sqlite3.connect(str(path))
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY, mtime_ns INTEGER, subdirs TEXT);
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, dir TEXT, size INTEGER, mtime_ns INTEGER, hash TEXT);
+            CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+        """)
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def lookup(self, path):
+        """``(size, mtime_ns, hash)`` for an indexed file, or ``None``; a missing hash is computed and stored."""
+        path = str(path)
+        row = self.db.execute("SELECT size, mtime_ns, hash FROM files WHERE path = ?", (path,)).fetchone()
+        if row and row[2] is None and self.with_hash:
+            row = (row[0], row[1], self._store_hash(path))
+        return row
+
+    def _store_hash(self, path: str) -> str:
+        digest = file_hash(path)
+        self.db.execute("UPDATE files SET hash = ? WHERE path = ?", (digest, path))
+        return digest
+
+    def fill_hashes(self) -> int:
+        """Hash every indexed file that has no hash yet; returns how many were hashed."""
+        todo = [r[0] for r in self.db.execute("SELECT path FROM files WHERE hash IS NULL ORDER BY path")]
+        for path in todo:
+            try:
+                self._store_hash(path)
+            except OSError:
+                continue
+        self.db.commit()
+        return len(todo)
+
+    def _cached_dir(self, d: str):
+        row = self.db.execute("SELECT mtime_ns, subdirs FROM dirs WHERE path = ?", (d,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _cached_files(self, d: str):
+        return [r[0] for r in self.db.execute("SELECT path FROM files WHERE dir = ? ORDER BY path", (d,))]
+
+    def _forget(self, d: str):
+        prefix = d.rstrip(os.sep) + os.sep
+        like = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        self.db.execute("DELETE FROM dirs WHERE path = ? OR path LIKE ? ESCAPE '\\'", (d, like))
+        self.db.execute("DELETE FROM files WHERE dir = ? OR dir LIKE ? ESCAPE '\\'", (d, like))
+
+    def _rescan_dir(self, d: str, mtime_ns: int):
+        """Yield the matching files of ``d`` as they are read; returns its subdirectories."""
+        subdirs = []
+        with os.scandir(d) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        old = {r[0]: r[1:] for r in self.db.execute(
+            "SELECT path, size, mtime_ns, hash FROM files WHERE dir = ?", (d,))}
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file() and _matches(entry.name, (INDEX_PATTERN,)):
+                st = entry.stat()
+                prev = old.pop(entry.path, None)
+                # 未变化的文件沿用旧哈希，其余留空，用到时再算
+                digest = prev[2] if prev and prev[0] == st.st_size and prev[1] == st.st_mtime_ns else None
+                self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                                (entry.path, d, st.st_size, st.st_mtime_ns, digest))
+                yield entry.path
+        # 已删除的文件 / 子目录
+        self.db.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in old])
+        cached = self._cached_dir(d)
+        for gone in set(cached[1] if cached else []) - set(subdirs):
+            self._forget(gone)
+        self.db.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", (d, mtime_ns, json.dumps(subdirs)))
+        self.db.commit()
+        return subdirs
+
+    def walk(self, root, rescan: bool = False, recursive: bool = True):
+        """Yield indexed file paths under ``root``, re-reading only directories whose mtime changed.
+
+        ``root`` is resolved first, so the yielded paths are absolute.
+        """
+        stack = [str(Path(root).resolve())]
+        while stack:
+            d = stack.pop()
+            try:
+                mtime_ns = os.stat(d).st_mtime_ns
+            except FileNotFoundError:
+                self._forget(d)
+                continue
+            cached = None if rescan else self._cached_dir(d)
+            if cached and cached[0] == mtime_ns:
+                yield from self._cached_files(d)
+                subdirs = cached[1]
+            else:
+                subdirs = yield from self._rescan_dir(d, mtime_ns)
+            if recursive:
+                stack.extend(reversed(subdirs))
+
+
+def _scan(root, recursive: bool = True):
+    stack = [str(root)]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                yield entry.path
+        if recursive:
+            stack.extend(reversed(subdirs))
+
+
+def iter_html_files(root, patterns=HTML_PATTERNS, index=None, recursive: bool = True, rescan: bool = False):
+    """Yield ``Path`` objects under ``root`` whose lower-cased name matches ``patterns``.
+
+    ``index`` is a ``FileIndex`` (or ``None`` for a plain walk). With
+    ``recursive=False`` only the files directly inside ``root`` are yielded.
+    Either way the paths are under ``root`` as given.
+    """
+    root = Path(root)
+    if not root.is_dir():
+        return
+    if index is not None:
+        # 索引按解析后的根目录记录，产出时再换回调用方给的根
+        real = root.resolve()
+        paths = (os.path.join(root, os.path.relpath(p, real)) for p in index.walk(real, rescan, recursive))
+    else:
+        paths = _scan(root, recursive)
+    for p in paths:
+        if _matches(os.path.basename(p), patterns):
+            yield Path(p)
+
+
+def add_discovery_args(parser):
+    parser.add_argument("--index", type=Path, help="持久化文件索引（SQLite）；之后的运行只重新读取有变化的目录")
+    parser.add_argument("--rescan", action="store_true", help="忽略目录 mtime，重新 stat 所有文件")
+
+
+def open_index(args):
+    """``FileIndex`` for ``--index``, or ``None``."""
+    return FileIndex(args.index) if getattr(args, "index", None) else None
+
+
+def discover(root, args, patterns=HTML_PATTERNS, recursive: bool = True):
+    """Stream matches under ``root`` using the CLI's ``--index`` / ``--rescan`` options."""
+    index = open_index(args)
+    try:
+        yield from iter_html_files(root, patterns, index, recursive, getattr(args, "rescan", False))
+    finally:
+        if index is not None:
+            index.close()
+
+
+# ─── MAIN ──────────────────────────────────────────────────────────────────
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Stream HTML files under a corpus root, optionally via a persistent index.")
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--pattern", action="append", help="文件名模式，可重复；默认 *.html 和 *.htm")
+    parser.add_argument("--no-hash", dest="with_hash", action="store_false", help="列完文件后不补算内容哈希")
+    add_discovery_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    index = FileIndex(args.index, args.with_hash) if args.index else None
+    try:
+        for p in iter_html_files(args.root, tuple(args.pattern or HTML_PATTERNS), index, rescan=args.rescan):
+            print(p, flush=True)
+        if index is not None and args.with_hash:
+            index.fill_hashes()
+    finally:
+        if index is not None:
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import os
+import sys
+import json
+import random
+import argparse
+from pathlib import Path
+
+from webrssbench.dedup import add_cluster_args, filter_paths, load_cluster_map
+from webrssbench.discovery import add_discovery_args, discover
+from webrssbench.profiling import add_profiling_args, monitor_from_args, run_page, traced
+from webrssbench.seeding import add_seed_args, page_rng, resolve_run_seed, rng_uuid4
+from webrssbench.viewports import add_viewport_args, apply_viewport
+
+# ================== 顶部定义配置 ==================
+DISTURB_LEVEL = "hard"
+CHROME_PATH = None
+STABLE_ID_ATTR = "data-wrb-id"   # 扰动前打在元素上的稳定编号
+MOVE_TOLERANCE = 0.5             # 位移超过该像素数才算移动
+# ==================================================
+
+# 一次 evaluate 取回所有带编号元素的页面坐标
+COLLECT_RECTS_JS = f"""
+() => {{
+    const sx = window.scrollX, sy = window.scrollY;
+    const out = {{}};
+    document.querySelectorAll('[{STABLE_ID_ATTR}]').forEach(el => {{
+        const r = el.getBoundingClientRect();
+        if (r.width <= 0 && r.height <= 0) return;
+        out[el.getAttribute('{STABLE_ID_ATTR}')] = [r.x + sx, r.y + sy, r.width, r.height];
+    }});
+    return out;
+}}
+"""
+
+
+def wrapper_injection(soup, depth=3, times=1, rng=random):
+    candidates = [tag for tag in soup.find_all(True) if len(tag.find_parents()) >= depth]
+    for _ in range(times):
+        if not candidates:
+            return
+        target = rng.choice(candidates)
+        wrapper = soup.new_tag("div", **{"class": f"noise-wrap-{rng_uuid4(rng).hex[:4]}"})
+        target.wrap(wrapper)
+
+
+def role_replacement(soup, times=1):
+    buttons = soup.find_all(["button", "input"], attrs={"type": "submit"})
+    buttons = buttons * times  # 增加替换数量
+    for b in buttons:
+        new_div = soup.new_tag("div", role="button")
+        if stable_id := b.get(STABLE_ID_ATTR):
+            new_div[STABLE_ID_ATTR] = stable_id
+        new_div.string = b.get_text(strip=True) or b.get("value", "")
+        if aria := b.get("aria-label"):
+            new_div["aria-label"] = aria
+        b.replace_with(new_div)
+
+
+def redundant_nodes(soup, count=5, rng=random):
+    for _ in range(count):
+        hidden = soup.new_tag("div", style="display:none;width:1px;height:1px;", id=f"ghost-{rng_uuid4(rng).hex[:6]}")
+        soup.body.append(hidden)
+
+
+# 每个算子接收 (soup, rng)；随机选择和 uuid 命名都取自该页的 rng
+OPERATORS = {
+    "easy": [
+        lambda s, rng: redundant_nodes(s, count=3, rng=rng),
+    ],
+    "medium": [
+        lambda s, rng: wrapper_injection(s, depth=3, times=1, rng=rng),
+        lambda s, rng: role_replacement(s, times=1),
+        lambda s, rng: redundant_nodes(s, count=10, rng=rng),
+    ],
+    "hard": [
+        lambda s, rng: wrapper_injection(s, depth=2, times=3, rng=rng),
+        lambda s, rng: role_replacement(s, times=3),
+        lambda s, rng: redundant_nodes(s, count=50, rng=rng),
+        lambda s, rng: wrapper_injection(s, depth=1, times=3, rng=rng),
+    ],
+}
+
+
+def stamp_stable_ids(soup):
+    root = soup.body or soup
+    for idx, tag in enumerate(root.find_all(True)):
+        tag[STABLE_ID_ATTR] = str(idx)
+
+
+def strip_stable_ids(soup):
+    for tag in soup.find_all(attrs={STABLE_ID_ATTR: True}):
+        del tag[STABLE_ID_ATTR]
+
+
+def disturb_source(html: str, level: str = DISTURB_LEVEL, rng=random):
+    """返回 (扰动前已打编号的 HTML, 扰动后已打编号的 HTML, 扰动后去掉编号的 HTML)。
+
+    前两者只用于测量位移，发布的 disturbed.html 用第三个。
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+    stamp_stable_ids(soup)
+    stamped = str(soup)
+    for op in OPERATORS[level]:
+        op(soup, rng)
+    disturbed = str(soup)
+    strip_stable_ids(soup)
+    return stamped, disturbed, str(soup)
+
+
+def disturb_html(html_path: Path, out_path: Path, level: str = DISTURB_LEVEL, rng=random):
+    """写出去掉编号的扰动 HTML，返回 (扰动前, 扰动后) 两份打过编号的 HTML，用于测量位移。"""
+    stamped, disturbed, published = disturb_source(html_path.read_text("utf-8", errors="ignore"), level, rng)
+    out_path.write_text(published, "utf-8")
+    return stamped, disturbed
+
+
+def layout_shift(before: dict, after: dict, tolerance: float = MOVE_TOLERANCE) -> dict:
+    """比较扰动前后同一编号元素的位置/尺寸。"""
+    moved = []
+    shifts = []
+    for sid, (x0, y0, w0, h0) in before.items():
+        if sid not in after:
+            continue
+        x1, y1, w1, h1 = after[sid]
+        dx, dy, dw, dh = x1 - x0, y1 - y0, w1 - w0, h1 - h0
+        shift = max(abs(dx), abs(dy))
+        shifts.append(shift)
+        if shift > tolerance or max(abs(dw), abs(dh)) > tolerance:
+            moved.append({
+                "id": sid,
+                "before": [round(v, 2) for v in (x0, y0, w0, h0)],
+                "dx": round(dx, 2), "dy": round(dy, 2),
+                "dw": round(dw, 2), "dh": round(dh, 2),
+            })
+    moved.sort(key=lambda m: -max(abs(m["dx"]), abs(m["dy"])))
+    return {
+        "elements_before": len(before),
+        "elements_after": len(after),
+        "elements_compared": len(shifts),
+        "elements_vanished": sum(1 for sid in before if sid not in after),
+        "moved_count": len(moved),
+        "moved_ratio": round(len(moved) / len(shifts), 4) if shifts else 0.0,
+        "max_shift": round(max(shifts), 2) if shifts else 0.0,
+        "mean_shift": round(sum(shifts) / len(shifts), 2) if shifts else 0.0,
+        "moved_elements": moved,
+    }
+
+
+def screenshot_html(playwright, html_file: Path, png_path: Path, chrome_path=CHROME_PATH):
+    browser = playwright.chromium.launch(executable_path=chrome_path, headless=True)
+    page = browser.new_page()
+    with traced(page):
+        page.goto(html_file.as_uri(), wait_until="load", timeout=60000)
+        page.screenshot(path=str(png_path), full_page=True)
+    browser.close()
+
+
+def process_single(html_file: Path, output_dir: Path, level: str = DISTURB_LEVEL, chrome_path=CHROME_PATH,
+                   viewports=None, rng=random):
+    """扰动单页并截图。给定 viewports 时每个文档只加载一次，各视口输出到 output_dir/<视口>/<stem>。"""
+    from playwright.sync_api import sync_playwright
+
+    base = html_file.stem
+    if viewports:
+        subdirs = {name: output_dir / name / base for name in viewports}
+    else:
+        subdirs = {None: output_dir / base}
+    for subdir in subdirs.values():
+        subdir.mkdir(parents=True, exist_ok=True)
+
+    first = next(iter(subdirs.values()))
+    disturbed_html = first / "disturbed.html"
+    stamped_html, disturbed_stamped = disturb_html(html_file, disturbed_html, level, rng)
+    for subdir in subdirs.values():
+        if subdir != first:
+            (subdir / "disturbed.html").write_bytes(disturbed_html.read_bytes())
+
+    def each_viewport(page):
+        for name, subdir in subdirs.items():
+            if name is not None:
+                apply_viewport(page, viewports[name])
+            yield name, subdir
+
+    rects_before, rects_after = {}, {}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(executable_path=chrome_path, headless=True)
+        page = browser.new_page()
+        with traced(page):
+            page.goto(html_file.as_uri(), wait_until="load", timeout=60000)
+            for name, subdir in each_viewport(page):
+                page.screenshot(path=str(subdir / "original.png"), full_page=True)
+            # 前后两份文档都在输入文件的 URL 下替换进来，相对资源照常解析，测量口径一致
+            page.set_content(stamped_html, wait_until="load", timeout=60000)
+            for name, subdir in each_viewport(page):
+                rects_before[name] = page.evaluate(COLLECT_RECTS_JS)
+
+            page.set_content(disturbed_stamped, wait_until="load", timeout=60000)
+            for name, subdir in each_viewport(page):
+                page.screenshot(path=str(subdir / "disturbed.png"), full_page=True)
+                rects_after[name] = page.evaluate(COLLECT_RECTS_JS)
+        browser.close()
+
+    for name, subdir in subdirs.items():
+        meta = {
+            "html_file": str(html_file),
+            "level": level,
+            "original": str(subdir / "original.png"),
+            "disturbed": str(subdir / "disturbed.png"),
+            "layout_shift": layout_shift(rects_before[name], rects_after[name]),
+        }
+        if name is not None:
+            meta["viewport"] = {"name": name, **viewports[name]}
+        with open(subdir / "analysis_result.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Apply layout perturbations and capture original/disturbed screenshots.")
+    parser.add_argument("input_dir", type=Path, help="输入 HTML 目录（递归查找 *.html）")
+    parser.add_argument("output_dir", type=Path, help="输出目录")
+    parser.add_argument("--level", choices=sorted(OPERATORS), default=DISTURB_LEVEL, help="扰动强度")
+    parser.add_argument("--chrome-path", default=CHROME_PATH, help="自定义 Chromium 可执行文件路径")
+    add_seed_args(parser)
+    add_cluster_args(parser)
+    add_discovery_args(parser)
+    add_viewport_args(parser)
+    add_profiling_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from rich.console import Console
+    from tqdm import tqdm
+
+    args = parse_args(argv)
+    console = Console()
+    input_dir = args.input_dir.resolve()
+    output_dir = args.output_dir.resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # 边发现边处理，按名字顺序遍历
+    html_files = discover(input_dir, args, ("*.html",))
+    if args.clusters:
+        html_files = filter_paths(html_files, input_dir, load_cluster_map(args.clusters), args.per_cluster)
+
+    monitor = monitor_from_args(args, output_dir)
+    run_seed = resolve_run_seed(args.seed)
+    console.print(f"[bold cyan]▶ Processing HTML files under {input_dir} at level '{args.level}' (seed {run_seed}) …[/]")
+    total = 0
+    for html_path in tqdm(html_files, desc="Disturb", unit="file"):
+        total += 1
+        key = html_path.relative_to(input_dir).as_posix()
+        try:
+            run_page(monitor, key, process_single,
+                     html_path, output_dir, args.level, args.chrome_path, args.viewports, page_rng(run_seed, key),
+                     output_arg="output_dir")
+        except Exception as e:
+            console.print(f"[red]Error on {html_path}: {e}")
+
+    if not total:
+        console.print("[bold red]❌ No HTML files found in input directory.")
+        sys.exit(1)
+    console.print(f"[bold green]✔ Done. {total} HTML files processed. Results saved in: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+One-load runner for every WebRSSBench task.
+
+Each page is loaded once, fitted to its full size and captured once as
+``original.png``. The stages then run in order on the same live document:
+
+    position  extract_from_page                       (read only)
+    text      select_buttons + advanced_perturb_text  → text/disturbed.png
+    color     choose_recolors + restyle               → color/disturbed.png
+    layout    OPERATORS[level] on the source file     → layout/disturbed.png
+
+Between stages the DOM is restored from an in-page snapshot
+(``documentElement.cloneNode``) and the re-inserted stylesheets and images are
+waited for before the next capture. Layout is last; its operators work on
+BeautifulSoup over the source file (not the script-mutated DOM), and the
+stamped and disturbed documents are swapped in with ``set_content`` under the
+original URL. All stages write to one ``analysis_result.json`` per page.
+
+Each stage draws from its own stream split off the page's rng, so a stage's
+output does not depend on which other stages were selected.
+
+用法：
+    python -m webrssbench.pipeline INPUT_DIR OUTPUT_DIR [--stages position,text,color,layout]
+"""
+
+import json
+import random
+import logging
+import argparse
+import traceback
+from pathlib import Path
+
+from webrssbench import TextRobustness, colorRobustness, layoutRobustness, position
+from webrssbench.dedup import add_cluster_args, filter_paths, load_cluster_map
+from webrssbench.discovery import add_discovery_args, discover
+from webrssbench.profiling import add_profiling_args, monitor_from_args, run_page, traced
+from webrssbench.seeding import add_seed_args, page_rng, resolve_run_seed
+from webrssbench.viewports import fit_to_content, settle
+
+STAGES = ["position", "text", "color", "layout"]
+
+ASSET_TIMEOUT_MS = 10000   # 恢复 DOM 后等待样式表 / 图片的上限
+
+SNAPSHOT_JS = "() => { window.__wrbSnapshot = document.documentElement.cloneNode(true); }"
+RESTORE_JS = """
+() => {
+    document.replaceChild(window.__wrbSnapshot.cloneNode(true), document.documentElement);
+}
+"""
+
+# 等待尚未加载完的样式表和图片（出错也算结束），最多 timeout 毫秒
+WAIT_ASSETS_JS = """
+timeout => {
+    const done = el => new Promise(r => {
+        el.addEventListener('load', r, {once: true});
+        el.addEventListener('error', r, {once: true});
+    });
+    const pending = [
+        ...Array.from(document.querySelectorAll('link[rel~="stylesheet"]')).filter(l => !l.sheet),
+        ...Array.from(document.images).filter(img => !img.complete),
+    ];
+    return Promise.race([
+        Promise.all(pending.map(done)),
+        new Promise(r => setTimeout(r, timeout)),
+    ]);
+}
+"""
+
+# 与 colorRobustness.find_all_buttons 相同的判定，按文档顺序
+COLOR_BUTTONS_JS = """
+() => {
+    const out = [];
+    document.querySelectorAll('*').forEach(el => {
+        const tag = el.tagName.toLowerCase();
+        const type = (el.getAttribute('type') || '').toLowerCase();
+        if (tag === 'button'
+            || (tag === 'input' && ['button', 'submit', 'reset'].includes(type))
+            || el.classList.contains('button')
+            || el.getAttribute('role') === 'button') {
+            const r = el.getBoundingClientRect();
+            el.setAttribute('data-wrb-color-idx', out.length);
+            out.push({x: r.x, y: r.y, width: r.width, height: r.height,
+                      style: el.getAttribute('style') || ''});
+        }
+    });
+    return out;
+}
+"""
+
+SET_STYLES_JS = """
+changes => changes.forEach(c => {
+    const el = document.querySelector(`[data-wrb-color-idx="${c.idx}"]`);
+    if (el) el.setAttribute('style', c.style);
+})
+"""
+
+
+def restore(page):
+    page.evaluate(RESTORE_JS)
+    page.evaluate(WAIT_ASSETS_JS, ASSET_TIMEOUT_MS)
+    settle(page)
+
+
+# ─── stages ────────────────────────────────────────────────────────────────
+def run_position(page, html_path: Path, page_dir: Path, opts, rng=random) -> dict:
+    url = html_path.resolve().as_uri()
+    return position.extract_from_page(page, url, str(page_dir / "position" / "random_crops"), rng)
+
+
+def run_text(page, html_path: Path, page_dir: Path, opts, rng=random) -> dict:
+    out_dir = page_dir / "text"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    elements = page.evaluate(TextRobustness.COLLECT_BUTTONS_JS)
+    selected = TextRobustness.select_buttons(elements, opts.need_btn_num, rng)
+    TextRobustness.draw_boxes(page_dir / "original.png", selected, out_dir / "annotated_before.png")
+
+    page.evaluate(TextRobustness.SET_TEXT_JS, [selected, "perturbed_text"])
+    page.screenshot(path=str(out_dir / "disturbed.png"), full_page=True)
+    TextRobustness.draw_boxes(out_dir / "disturbed.png", selected, out_dir / "annotated_after.png")
+    return {
+        "disturbed": "text/disturbed.png",
+        "annotated_before": "text/annotated_before.png",
+        "annotated_after": "text/annotated_after.png",
+        "selected_buttons": TextRobustness.button_records(selected),
+    }
+
+
+def run_color(page, html_path: Path, page_dir: Path, opts, rng=random) -> dict:
+    out_dir = page_dir / "color"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    buttons = page.evaluate(COLOR_BUTTONS_JS)
+    recolored = colorRobustness.choose_recolors(
+        buttons, colorRobustness.LEVEL_PROB[opts.color_level], opts.min_area, rng)
+    changes = [{"idx": r["idx"], "style": colorRobustness.restyle(buttons[r["idx"]]["style"], r["color"])}
+               for r in recolored]
+    page.evaluate(SET_STYLES_JS, changes)
+    page.screenshot(path=str(out_dir / "disturbed.png"), full_page=True)
+    return {
+        "level": opts.color_level,
+        "disturbed": "color/disturbed.png",
+        "total_buttons": len(buttons),
+        "recolored_buttons": recolored,
+    }
+
+
+def run_layout(page, html_path: Path, page_dir: Path, opts, rng=random) -> dict:
+    out_dir = page_dir / "layout"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # 用源文件而不是 page.content()：后者是脚本执行后的 DOM，set_content 会让内联脚本再跑一遍
+    source = html_path.read_text("utf-8", errors="ignore")
+    stamped, disturbed, published = layoutRobustness.disturb_source(source, opts.layout_level, rng)
+    (out_dir / "disturbed.html").write_text(published, "utf-8")
+
+    # 同一 URL 下替换文档，相对资源照常解析
+    page.set_content(stamped, wait_until="load", timeout=60000)
+    rects_before = page.evaluate(layoutRobustness.COLLECT_RECTS_JS)
+    page.set_content(disturbed, wait_until="load", timeout=60000)
+    page.screenshot(path=str(out_dir / "disturbed.png"), full_page=True)
+    rects_after = page.evaluate(layoutRobustness.COLLECT_RECTS_JS)
+    return {
+        "level": opts.layout_level,
+        "disturbed": "layout/disturbed.png",
+        "layout_shift": layoutRobustness.layout_shift(rects_before, rects_after),
+    }
+
+
+STAGE_FUNCS = {
+    "position": run_position,
+    "text": run_text,
+    "color": run_color,
+    "layout": run_layout,
+}
+
+
+def process_page(html_path: Path, page_dir: Path, opts, rng=random) -> dict:
+    """Run the selected stages on one page and write its metadata record; returns the record."""
+    from playwright.sync_api import sync_playwright
+
+    page_dir.mkdir(parents=True, exist_ok=True)
+    url = html_path.resolve().as_uri()
+    record = {"html_file": str(html_path), "original": "original.png"}
+    # 无论选了哪些阶段，都按固定顺序为每个阶段取子种子
+    stage_seeds = {name: rng.getrandbits(64) for name in STAGES}
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        page = browser.new_page()
+        with traced(page):
+            page.goto(url, wait_until="load", timeout=60000)
+
+            # 整页尺寸，所有阶段共用
+            width = page.evaluate("() => document.documentElement.scrollWidth")
+            height = fit_to_content(page, width)
+            record["page_size"] = [width, height]
+            page.screenshot(path=str(page_dir / "original.png"), full_page=True)
+            page.evaluate(SNAPSHOT_JS)
+
+            stages = [s for s in STAGES if s in opts.stages]
+            for i, name in enumerate(stages):
+                try:
+                    record[name] = STAGE_FUNCS[name](page, html_path, page_dir, opts, random.Random(stage_seeds[name]))
+                except Exception as e:
+                    logging.error("✗ %s: stage %s failed: %s", html_path, name, e)
+                    logging.debug(traceback.format_exc())
+                    record[name] = {"error": str(e)}
+                # position 只读，layout 在最后，不用恢复
+                if name in ("text", "color") and i + 1 < len(stages):
+                    restore(page)
+        browser.close()
+
+    with open(page_dir / "analysis_result.json", "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2, ensure_ascii=False)
+    return record
+
+
+# ─── MAIN ──────────────────────────────────────────────────────────────────
+def parse_stages(spec: str):
+    stages = [s.strip() for s in spec.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"unknown stages: {', '.join(sorted(unknown))}")
+    return stages
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run position, text, color and layout tasks with one page load.")
+    parser.add_argument("input_dir", type=Path, help="HTML 输入根目录（递归查找 *.htm*）")
+    parser.add_argument("output_dir", type=Path, help="输出根目录，镜像输入结构")
+    parser.add_argument("--stages", type=parse_stages, default=list(STAGES), help="逗号分隔，按固定顺序执行")
+    parser.add_argument("--need-btn-num", type=int, default=TextRobustness.NEED_BTN_NUM)
+    parser.add_argument("--color-level", choices=sorted(colorRobustness.LEVEL_PROB), default=colorRobustness.DISTURB_LEVEL)
+    parser.add_argument("--min-area", type=int, default=colorRobustness.MIN_AREA)
+    parser.add_argument("--layout-level", choices=sorted(layoutRobustness.OPERATORS), default=layoutRobustness.DISTURB_LEVEL)
+    add_seed_args(parser)
+    add_cluster_args(parser)
+    add_discovery_args(parser)
+    add_profiling_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from tqdm import tqdm
+
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    run_seed = resolve_run_seed(args.seed)
+
+    input_dir = args.input_dir.resolve()
+    files = discover(input_dir, args, ("*.htm*",))
+    if args.clusters:
+        files = filter_paths(files, input_dir, load_cluster_map(args.clusters), args.per_cluster)
+
+    monitor = monitor_from_args(args, args.output_dir)
+    total = ok = 0
+    for html in tqdm(files, desc="Pipeline", unit="page"):
+        total += 1
+        rel = html.relative_to(input_dir)
+        key = rel.as_posix()
+        try:
+            record = run_page(monitor, key, process_page, html, args.output_dir / rel.parent / html.stem, args,
+                              page_rng(run_seed, key), output_arg="page_dir")
+        except Exception as e:
+            logging.error("✗ %s failed: %s", rel, e)
+            continue
+        if not any("error" in record.get(s, {}) for s in args.stages):
+            ok += 1
+
+    logging.info("✔ %d/%d pages passed every stage → %s", ok, total, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+import os
+import io
+import json
+import argparse
+import traceback
+import logging
+from datetime import datetime
+import random
+
+from webrssbench.annotate import crop_box, draw_layout_boxes
+from webrssbench.discovery import add_discovery_args, discover
+from webrssbench.dedup import add_cluster_args, filter_paths, load_cluster_map
+from webrssbench.profiling import add_profiling_args, monitor_from_args, run_page, traced
+from webrssbench.seeding import add_seed_args, page_rng, resolve_run_seed, viewport_rngs
+from webrssbench.viewports import add_viewport_args, apply_viewport
+
+def boxes_adjacent(box1, box2, align_tolerance=8, adj_tolerance=4):
+    vertical_center1 = box1['y'] + box1['height'] / 2
+    vertical_center2 = box2['y'] + box2['height'] / 2
+
+    horizontal_center1 = box1['x'] + box1['width'] / 2
+    horizontal_center2 = box2['x'] + box2['width'] / 2
+    vertically_aligned = abs(vertical_center1 - vertical_center2) <= align_tolerance
+
+
+    horizontally_adjacent = (box1['x'] + box1['width'] + adj_tolerance >= box2['x'] and box1['x'] < box2['x']) or \
+                            (box2['x'] + box2['width'] + adj_tolerance >= box1['x'] and box2['x'] < box1['x'])
+
+
+    horizontally_aligned = abs(horizontal_center1 - horizontal_center2) <= align_tolerance
+    vertically_adjacent = (box1['y'] + box1['height'] + adj_tolerance >= box2['y'] and box1['y'] < box2['y']) or \
+                          (box2['y'] + box2['height'] + adj_tolerance >= box1['y'] and box2['y'] < box1['y'])
+
+    return (vertically_aligned and horizontally_adjacent) or (horizontally_aligned and vertically_adjacent)
+
+
+def merge_boxes(box1, box2):
+    x1 = min(box1['x'], box2['x'])
+    y1 = min(box1['y'], box2['y'])
+    x2 = max(box1['x'] + box1['width'], box2['x'] + box2['width'])
+    y2 = max(box1['y'] + box1['height'], box2['y'] + box2['height'])
+    return {
+        'x': x1,
+        'y': y1,
+        'width': x2 - x1,
+        'height': y2 - y1
+    }
+
+
+def is_within(box1, box2):
+    return (box1['x'] >= box2['x'] and
+            box1['y'] >= box2['y'] and
+            box1['x'] + box1['width'] <= box2['x'] + box2['width'] and
+            box1['y'] + box1['height'] <= box2['y'] + box2['height'])
+
+def setup_logging(output_folder):
+    logging.basicConfig(
+        filename=os.path.join(output_folder, "analysis.log"),
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    console = logging.StreamHandler()
+    console.setLevel(logging.INFO)
+    logging.getLogger().addHandler(console)
+
+
+def create_unique_output_folder(base_path=None, prefix="layout_analysis"):
+    if base_path is None:
+        base_path = os.path.join(os.path.expanduser("~"), "Desktop")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    folder_name = f"{prefix}_{timestamp}"
+    output_path = os.path.join(base_path, folder_name)
+    counter = 1
+    while os.path.exists(output_path):
+        output_path = os.path.join(base_path, f"{folder_name}_{counter}")
+        counter += 1
+    os.makedirs(output_path, exist_ok=True)
+    return output_path
+
+
+def select_folder(title="Select folder"):
+    # tkinter 只在 GUI 选择目录时才需要
+    from tkinter import filedialog, Tk
+
+    root = Tk()
+    root.withdraw()
+    folder_path = filedialog.askdirectory(title=title)
+    return folder_path
+
+
+def show_message(kind, title, message):
+    from tkinter import messagebox
+
+    getattr(messagebox, f"show{kind}")(title, message)
+
+
+def find_html_files(folder_path, args=None):
+    # 边遍历边产出；--index 时只重新读取有变化的目录
+    for path in discover(folder_path, args):
+        yield str(path)
+
+
+def extract(blocks, url, min_width=30, min_height=30):
+    # 处理本地路径
+    if os.path.exists(url):
+        url = "file://" + os.path.abspath(url)
+
+    # 提取视觉组件
+    visual_components = []
+    for block in blocks:
+        left = block.get("left", 0)
+        top = block.get("top", 0)
+        width = block.get("width", 0)
+        height = block.get("height", 0)
+
+        # 跳过太小的块
+        if width < min_width or height < min_height:
+            continue
+
+        visual_components.append({
+            "left": left,
+            "top": top,
+            "width": width,
+            "height": height,
+            "text": block.get("text", "")
+        })
+
+    return visual_components
+
+EMPTY_RESULT = {
+    "all_blocks": [],
+    "selected_blocks": [],
+    "visual_components": []
+}
+
+
+def extract_visual_components(url, crop_folder=None, rng=random):
+    """Extract visual components from a webpage, save original full screenshot, and avoid black crops."""
+    from playwright.sync_api import sync_playwright
+
+    if os.path.exists(url):
+        url = "file://" + os.path.abspath(url)
+
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch()
+            page = browser.new_page()
+            with traced(page):
+                page.goto(url, timeout=60000)
+                result = extract_from_page(page, url, crop_folder, rng)
+            browser.close()
+            return result
+
+    except Exception as e:
+        logging.error(f"Error during extraction: {str(e)}")
+        logging.error(traceback.format_exc())
+        return dict(EMPTY_RESULT)
+
+
+def extract_visual_components_matrix(url, crop_folders, viewports, rng=random):
+    """Load the page once and run the extraction at every viewport.
+
+    ``crop_folders`` maps viewport name to its crop folder. Returns ``{name: result}``.
+    """
+    from playwright.sync_api import sync_playwright
+
+    if os.path.exists(url):
+        url = "file://" + os.path.abspath(url)
+
+    results = {name: dict(EMPTY_RESULT) for name in viewports}
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch()
+            page = browser.new_page()
+            with traced(page):
+                page.goto(url, timeout=60000)
+                rngs = viewport_rngs(rng, viewports)
+                for name, size in viewports.items():
+                    try:
+                        apply_viewport(page, size)
+                        results[name] = extract_from_page(page, url, crop_folders[name], rngs[name])
+                    except Exception as e:
+                        logging.error(f"Error during extraction at viewport {name}: {str(e)}")
+                        logging.error(traceback.format_exc())
+            browser.close()
+    except Exception as e:
+        logging.error(f"Error during extraction: {str(e)}")
+        logging.error(traceback.format_exc())
+    return results
+
+
+def extract_from_page(page, url, crop_folder=None, rng=random):
+    """Run the block extraction on an already loaded page at its current viewport.
+
+    Blocks are sampled from ``rng``, the page's own stream (see ``seeding.page_rng``).
+    """
+    from PIL import Image
+
+    total_width = page.evaluate("() => document.documentElement.scrollWidth")
+    total_height = page.evaluate("() => document.documentElement.scrollHeight")
+
+    selectors = {
+        'video': 'video',
+        'image': 'img',
+        'text_block': 'p, span, a, strong, h1, h2, h3, h4, h5, h6, li, th, td, label, code, pre, div',
+        'form_table': 'form, table, div.form',
+        'button': 'button, input[type="button"], input[type="submit"], [role="button"], input',
+        'nav_bar': 'nav, [role="navigation"], .navbar, [class~="nav"], [class~="navigation"], [class~="menu"], [class~="navbar"], [id="menu"], [id="nav"], [id="navigation"], [id="navbar"]',
+        'divider': 'hr, [class*="separator"], [class*="divider"], [id="separator"], [id="divider"], [role="separator"]',
+    }
+
+    all_elements = []
+    for selector in selectors.values():
+        for element in page.query_selector_all(selector):
+            if not element.is_visible():
+                continue
+            box = element.bounding_box()
+            if not box or box['width'] <= 0 or box['height'] <= 0:
+                continue
+            tag_name = element.evaluate("el => el.tagName.toLowerCase()")
+            is_direct_text = element.evaluate("""
+                (el) => Array.from(el.childNodes).some(node =>
+                    node.nodeType === Node.TEXT_NODE && node.textContent.trim() !== '')
+            """)
+            if tag_name == 'div' and not is_direct_text:
+                continue
+            text_content = element.text_content().strip() if element.evaluate("el => el.innerText") else None
+            all_elements.append({
+                'box': box,
+                'text': text_content or ""
+            })
+
+    # Merge text blocks
+    all_elements.sort(key=lambda b: (b['box']['y'], b['box']['x']))
+    merged_elements = []
+    while all_elements:
+        current = all_elements.pop(0)
+        index = 0
+        while index < len(all_elements):
+            if boxes_adjacent(current['box'], all_elements[index]['box']):
+                current['text'] += " " + all_elements[index]['text']
+                current['box'] = merge_boxes(current['box'], all_elements[index]['box'])
+                del all_elements[index]
+            else:
+                index += 1
+        merged_elements.append(current)
+
+    # 给每个块编号
+    for idx, block in enumerate(merged_elements):
+        block['id'] = str(idx + 1)
+
+    # Clean full screenshot
+    image_bytes = page.screenshot(full_page=True, animations="disabled", timeout=60000)
+    clean_image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+
+    if crop_folder:
+        os.makedirs(crop_folder, exist_ok=True)
+        clean_image.save(os.path.join(crop_folder, "original.png"))
+
+    # 随机选择 8 个块
+    selected_blocks_output = []
+    selected = []
+    tries = 0
+    max_attempts = 50
+    while len(selected) < min(4, len(merged_elements)) and tries < max_attempts:
+        block = rng.choice(merged_elements)
+        if block in selected:
+            tries += 1
+            continue
+
+        crop = crop_box(clean_image, block['box'])
+        if not crop.getbbox():  # Entirely black
+            tries += 1
+            continue
+
+        crop_path = os.path.join(crop_folder, f"crop_{block['id']}.png")
+        crop.save(crop_path)
+        selected.append(block)
+
+        selected_blocks_output.append({
+            "id": block['id'],
+            "text": block['text'],
+            "box": {
+                'x': block['box']['x'] / total_width,
+                'y': block['box']['y'] / total_height,
+                'width': block['box']['width'] / total_width,
+                'height': block['box']['height'] / total_height
+            }
+        })
+
+    # 画出随机选择的那几个块
+    if crop_folder:
+        # 样式见 annotate.LAYOUT_STYLE；离线重标注用同一套实现
+        screenshot_image = draw_layout_boxes(clean_image, selected)
+        screenshot_image.save(os.path.join(crop_folder, "layout_with_boxes.png"))
+
+    # All block info
+    output_data = []
+    for block in merged_elements:
+        b = block['box']
+        output_data.append({
+            "id": block['id'],
+            "box": {
+                'x': b['x'] / total_width,
+                'y': b['y'] / total_height,
+                'width': b['width'] / total_width,
+                'height': b['height'] / total_height
+            }
+        })
+
+    return {
+        "page_size": [total_width, total_height],
+        "all_blocks": output_data,
+        "selected_blocks": selected_blocks_output,
+        "visual_components": extract(merged_elements, url)  # Return extracted visual components
+    }
+
+def save_results(output_folder, results):
+    try:
+        results_path = os.path.join(output_folder, "results.json")
+        with open(results_path, 'w') as f:
+            json.dump(results, f, indent=4)
+        logging.info(f"Results saved to {results_path}")
+    except Exception as e:
+        logging.error(f"Failed to save results: {str(e)}")
+        raise
+
+
+def write_analysis(html_file, file_output_folder, elements, viewport=None):
+    result = {
+        "html_file": html_file,
+        "elements": elements,
+        "screenshot": os.path.join(file_output_folder, "layout.png")
+    }
+    if viewport is not None:
+        result["viewport"] = viewport
+
+    with open(os.path.join(file_output_folder, "analysis_result.json"), 'w') as f:
+        json.dump(result, f, indent=2)
+
+    # 保存 random crop 的位置信息
+    random_crops_path = os.path.join(file_output_folder, "random_crops_info.json")
+    with open(random_crops_path, 'w') as f:
+        json.dump(elements.get("selected_blocks", []), f, indent=2)
+
+
+def analyze_html_file(html_file, output_folder, viewports=None, rng=random):
+    """Analyze one page; with ``viewports`` the page is loaded once and results go to ``output_folder/<viewport>/``."""
+    try:
+        file_name = os.path.splitext(os.path.basename(html_file))[0]
+        logging.info(f"Analyzing {html_file}...")
+
+        if viewports:
+            folders = {name: os.path.join(output_folder, name, file_name) for name in viewports}
+            for folder in folders.values():
+                os.makedirs(folder, exist_ok=True)
+            crop_folders = {name: os.path.join(folder, "random_crops") for name, folder in folders.items()}
+            matrix = extract_visual_components_matrix(html_file, crop_folders, viewports, rng)
+            for name, elements in matrix.items():
+                write_analysis(html_file, folders[name], elements, {"name": name, **viewports[name]})
+        else:
+            file_output_folder = os.path.join(output_folder, file_name)
+            os.makedirs(file_output_folder, exist_ok=True)
+            crop_folder = os.path.join(file_output_folder, "random_crops")
+            elements = extract_visual_components(html_file, crop_folder, rng)
+            write_analysis(html_file, file_output_folder, elements)
+
+        logging.info(f"Analysis completed for {html_file}")
+        return True
+    except Exception as e:
+        logging.error(f"Failed to analyze {html_file}: {str(e)}")
+        logging.error(traceback.format_exc())
+        return False
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Select blocks and generate relative-position labels for HTML pages.")
+    parser.add_argument("--input", help="folder containing HTML files (omit to pick one in a dialog)")
+    parser.add_argument("--output-base", help="parent folder for the timestamped output folder (default: ~/Desktop)")
+    parser.add_argument("--raster-store", help="also decode the renders into a memory-mapped raster store at this folder")
+    add_seed_args(parser)
+    add_cluster_args(parser)
+    add_discovery_args(parser)
+    add_viewport_args(parser)
+    add_profiling_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # 未指定 --input 时走原来的图形界面流程
+    gui = args.input is None
+    try:
+        output_folder = create_unique_output_folder(args.output_base)
+        setup_logging(output_folder)
+        logging.info(f"Output will be saved to: {output_folder}")
+        run_seed = resolve_run_seed(args.seed)
+
+        if gui:
+            logging.info("Please select the folder containing HTML files")
+            html_folder = select_folder("Select Folder with HTML Files")
+        else:
+            html_folder = args.input
+        if not html_folder:
+            logging.error("No folder selected")
+            return
+
+        html_files = find_html_files(html_folder, args)
+        if args.clusters:
+            html_files = filter_paths(html_files, html_folder, load_cluster_map(args.clusters), args.per_cluster)
+
+        from tqdm import tqdm
+
+        monitor = monitor_from_args(args, output_folder)
+        total = success_count = 0
+        with tqdm(html_files, desc="Analyzing HTML files") as pbar:
+            for html_file in pbar:
+                total += 1
+                pbar.set_postfix(file=os.path.basename(html_file))
+                # 页面键与平台无关，种子派生才可复现
+                key = os.path.relpath(html_file, html_folder).replace(os.sep, "/")
+                if run_page(monitor, key, analyze_html_file, html_file, output_folder, args.viewports,
+                            page_rng(run_seed, key), output_arg="output_folder"):
+                    success_count += 1
+
+        if not total:
+            logging.error("No HTML files found in the selected folder")
+            if gui:
+                show_message("error", "Error", "No HTML files found in the selected folder")
+            return
+
+        logging.info(f"\nAnalysis completed. Successfully analyzed {success_count}/{total} files.")
+        if args.raster_store:
+            from pathlib import Path
+            from webrssbench.raster_store import build_store
+
+            stored = build_store(Path(output_folder), Path(args.raster_store))
+            logging.info(f"Raster store updated with {stored} pages: {args.raster_store}")
+        if gui:
+            show_message("info", "Analysis Complete",
+                         f"Analysis completed.\nSuccessfully analyzed {success_count}/{total} files.\nResults saved to: {output_folder}")
+
+    except Exception as e:
+        logging.error(f"An error occurred during analysis: {str(e)}")
+        logging.error(traceback.format_exc())
+        if gui:
+            show_message("error", "Error", f"An error occurred: {str(e)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Outlier-triggered forensics for slow pages.
+
+``SlowPageMonitor.run`` times each per-page call. Only when a page is slower
+than ``--slow-threshold`` seconds (or the rolling p95 with ``--slow-p95``) is
+it re-run under capture: a Playwright trace per browser page, a cProfile of
+the per-page function and DOM size statistics. They are saved to
+``OUTPUT/slow_pages/<page>/`` and a row is appended to ``slow_pages.csv``.
+The state of the global ``random`` module and of any ``random.Random`` passed
+as an argument (the per-page rng) is restored before the re-run, so it
+repeats the first run. The argument named by ``output_arg`` is pointed at
+``slow_pages/<page>/output/`` for the re-run: it never writes to, or cleans
+up, the real page folders, and the first run's result is the one returned.
+
+Normal pages only pay for a ``perf_counter`` pair and the rng state snapshots;
+``traced`` is a no-op unless a capture is active. It stops and saves the trace
+even when the page times out or raises, which is the usual reason it is slow.
+The capture comes from the re-run, which may not reproduce the slowness;
+``record.json`` notes whether it did.
+"""
+
+import csv
+import json
+import time
+import random
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from collections import deque
+
+WINDOW       = 200    # 滚动 p95 的样本窗口
+MIN_SAMPLES  = 20     # 样本数不足时不启用 p95 判定
+MAX_CAPTURES = 50     # 每次运行最多取证的页面数
+SLOW_DIR     = "slow_pages"
+SLOW_CSV     = "slow_pages.csv"
+
+DOM_STATS_JS = """
+() => {
+    const all = document.getElementsByTagName('*');
+    const tags = {};
+    let maxDepth = 0;
+    for (const el of all) {
+        tags[el.tagName.toLowerCase()] = (tags[el.tagName.toLowerCase()] || 0) + 1;
+        let d = 0;
+        for (let p = el; p.parentElement; p = p.parentElement) d++;
+        if (d > maxDepth) maxDepth = d;
+    }
+    const top = Object.entries(tags).sort((a, b) => b[1] - a[1]).slice(0, 20);
+    return {
+        elements: all.length,
+        max_depth: maxDepth,
+        html_bytes: document.documentElement.outerHTML.length,
+        scroll_width: document.documentElement.scrollWidth,
+        scroll_height: document.documentElement.scrollHeight,
+        images: document.images.length,
+        stylesheets: document.styleSheets.length,
+        scripts: document.scripts.length,
+        top_tags: Object.fromEntries(top),
+    };
+}
+"""
+
+_capture_dir = None
+_trace_count = 0
+
+
+# ─── Playwright 钩子 ────────────────────────────────────────────────────────
+def begin_trace(page):
+    """Start a Playwright trace on ``page``'s context while a capture is active."""
+    if _capture_dir is None:
+        return
+    page.context.tracing.start(screenshots=True, snapshots=True)
+
+
+def end_trace(page):
+    """Save DOM statistics and the trace for ``page`` while a capture is active."""
+    global _trace_count
+    if _capture_dir is None:
+        return
+    _trace_count += 1
+    try:
+        stats = page.evaluate(DOM_STATS_JS)
+        with open(_capture_dir / f"dom_stats-{_trace_count}.json", "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+    except Exception as e:
+        logging.warning("dom stats failed: %s", e)
+    try:
+        page.context.tracing.stop(path=str(_capture_dir / f"trace-{_trace_count}.zip"))
+    except Exception as e:
+        logging.warning("trace stop failed: %s", e)
+
+
+@contextmanager
+def traced(page):
+    """``begin_trace`` on entry and ``end_trace`` on exit, including when the body raises."""
+    begin_trace(page)
+    try:
+        yield page
+    finally:
+        end_trace(page)
+
+
+# ─── 监控 ───────────────────────────────────────────────────────────────────
+def _rng_states(args, kwargs):
+    """``[(rng, state)]`` for the global ``random`` and every ``random.Random`` argument."""
+    rngs = [a for a in (*args, *kwargs.values()) if isinstance(a, random.Random)]
+    return [(random, random.getstate())] + [(r, r.getstate()) for r in rngs]
+
+
+class SlowPageMonitor:
+    def __init__(self, out_root, threshold=None, use_p95=False, window: int = WINDOW,
+                 min_samples: int = MIN_SAMPLES, max_captures: int = MAX_CAPTURES):
+        self.out_root = Path(out_root)
+        self.threshold = threshold
+        self.use_p95 = use_p95
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.max_captures = max_captures
+        self.captures = 0
+
+    def p95(self):
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def limit(self):
+        limits = [self.threshold] if self.threshold is not None else []
+        if self.use_p95 and (p95 := self.p95()) is not None:
+            limits.append(p95)
+        return min(limits) if limits else None
+
+    def run(self, key: str, func, *args, output_arg=None, **kwargs):
+        """Call ``func`` for one page; re-run it under capture if it was flagged as slow.
+
+        ``output_arg`` names the parameter of ``func`` that holds its output
+        directory; the re-run gets a scratch directory there instead.
+        """
+        state = _rng_states(args, kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # 超时 / 抛异常的页面同样计时并取证，之后异常照常抛出
+            elapsed = time.perf_counter() - start
+            limit = self.limit()
+            self.samples.append(elapsed)
+            if limit is not None and elapsed > limit and self.captures < self.max_captures:
+                self.captures += 1
+                try:
+                    self.capture(key, func, args, kwargs, state, elapsed, limit, output_arg)
+                except Exception as e:
+                    logging.error("slow-page capture failed for %s: %s", key, e)
+
+    def capture(self, key, func, args, kwargs, state, elapsed, limit, output_arg=None):
+        import io
+        import cProfile
+        import pstats
+        import inspect
+
+        global _capture_dir, _trace_count
+        dest = self.out_root / SLOW_DIR / key.replace("/", "__").replace("\\", "__")
+        dest.mkdir(parents=True, exist_ok=True)
+        logging.warning("🐢 %s took %.2fs (limit %.2fs), capturing forensics → %s", key, elapsed, limit, dest)
+
+        scratch = None
+        if output_arg is not None:
+            # 重跑写进取证目录下的临时输出，失败时的清理也只发生在这里
+            scratch = dest / "output"
+            bound = inspect.signature(func).bind(*args, **kwargs)
+            bound.arguments[output_arg] = scratch
+            args, kwargs = bound.args, bound.kwargs
+        for rng, s in state:
+            rng.setstate(s)
+        profiler = cProfile.Profile()
+        error = None
+        _capture_dir, _trace_count = dest, 0
+        start = time.perf_counter()
+        try:
+            profiler.runcall(func, *args, **kwargs)
+        except Exception as e:
+            error = str(e)
+        finally:
+            _capture_dir = None
+        rerun = time.perf_counter() - start
+
+        profiler.dump_stats(dest / "profile.pstats")
+        buf = io.StringIO()
+        pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(40)
+        (dest / "profile.txt").write_text(buf.getvalue(), encoding="utf-8")
+
+        record = {
+            "page": key,
+            "function": f"{func.__module__}.{func.__qualname__}",
+            "elapsed": round(elapsed, 3),
+            "limit": round(limit, 3),
+            "threshold": self.threshold,
+            "p95": self.p95(),
+            "rerun_elapsed": round(rerun, 3),
+            # trace / profile 来自第二次运行，未必复现第一次的慢
+            "captured_from": "rerun",
+            "rerun_slow": limit is not None and rerun > limit,
+            "traces": _trace_count,
+            "rerun_output": str(scratch) if scratch is not None else None,
+            "error": error,
+        }
+        with open(dest / "record.json", "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2, ensure_ascii=False)
+
+        csv_path = self.out_root / SLOW_CSV
+        write_header = not csv_path.exists()
+        with csv_path.open("a", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(["page", "elapsed", "limit", "rerun_elapsed", "forensics_dir"])
+            writer.writerow([key, record["elapsed"], record["limit"], record["rerun_elapsed"], str(dest)])
+
+
+def add_profiling_args(parser):
+    parser.add_argument("--slow-threshold", type=float, default=None,
+                        help="单页耗时超过该秒数时重跑并保存 trace / cProfile / DOM 统计")
+    parser.add_argument("--slow-p95", action="store_true", help="单页耗时超过滚动 p95 时同样取证")
+    parser.add_argument("--max-captures", type=int, default=MAX_CAPTURES, help="每次运行最多取证的页面数")
+
+
+def monitor_from_args(args, out_root):
+    """Return a monitor, or ``None`` when no trigger is configured."""
+    if args.slow_threshold is None and not args.slow_p95:
+        return None
+    return SlowPageMonitor(out_root, args.slow_threshold, args.slow_p95, max_captures=args.max_captures)
+
+
+def run_page(monitor, key: str, func, *args, output_arg=None, **kwargs):
+    """``func(*args, **kwargs)``, timed through ``monitor`` when one is configured."""
+    if monitor is None:
+        return func(*args, **kwargs)
+    return monitor.run(key, func, *args, output_arg=output_arg, **kwargs)
@@ -0,0 +1,259 @@
+"""
+Memory-mapped store of decoded page renders with an on-demand crop API.
+
+Layout of a store directory:
+    pages.raw    decoded RGB uint8 pixels of every page, concatenated
+    index.json   {key: {"offset", "shape", "page_size", "blocks"}} (offset in bytes)
+
+``RasterStore.crop`` returns NumPy views into the memory map, so any
+``all_blocks`` region of any page can be read without PNG decoding or copying.
+
+Keys are ``<prefix>/<page dir relative to the output root>``; the prefix
+defaults to the output root's name, so position's timestamped run folders do
+not collide. Keys already in the store are skipped. With ``--replace`` they are
+re-appended and the old bytes stay orphaned until ``compact`` rewrites the data
+file.
+
+用法：
+    python -m webrssbench.raster_store build POSITION_OUTPUT STORE_DIR [--workers N] [--prefix NAME] [--replace]
+    python -m webrssbench.raster_store compact STORE_DIR
+"""
+
+import json
+import logging
+import argparse
+from pathlib import Path
+
+DATA_NAME  = "pages.raw"
+INDEX_NAME = "index.json"
+META_NAME  = "analysis_result.json"
+ALIGN      = 64          # 每页起始偏移按 64 字节对齐
+BATCH_SIZE = 8
+
+
+class RasterStoreWriter:
+    """Append pages to a store; an existing store is extended and keys already stored are skipped."""
+
+    def __init__(self, store_dir):
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        index_path = self.store_dir / INDEX_NAME
+        self.index = {}
+        if index_path.exists():
+            with open(index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        self.data = open(self.store_dir / DATA_NAME, "ab")
+
+    def add(self, key: str, pixels, page_size=None, blocks=None, replace: bool = False) -> bool:
+        """Store one page; returns False when ``key`` is already stored and ``replace`` is not set."""
+        import numpy as np
+
+        if key in self.index and not replace:
+            return False
+        pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+        offset = self.data.tell()
+        pad = -offset % ALIGN
+        if pad:
+            self.data.write(b"\0" * pad)
+            offset += pad
+        self.data.write(pixels.tobytes())
+        self.index[key] = {
+            "offset": offset,
+            "shape": list(pixels.shape),
+            "page_size": list(page_size) if page_size else [pixels.shape[1], pixels.shape[0]],
+            "blocks": blocks or [],
+        }
+        return True
+
+    def close(self):
+        self.data.close()
+        tmp = self.store_dir / (INDEX_NAME + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        tmp.replace(self.store_dir / INDEX_NAME)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RasterStore:
+    """Read-only view over a store directory."""
+
+    def __init__(self, store_dir):
+        import numpy as np
+
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / INDEX_NAME, encoding="utf-8") as f:
+            self.index = json.load(f)
+        data_path = self.store_dir / DATA_NAME
+        self.data = np.memmap(data_path, dtype=np.uint8, mode="r") if data_path.stat().st_size else None
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def keys(self):
+        return self.index.keys()
+
+    def image(self, key: str):
+        """The whole page as an ``(h, w, 3)`` view."""
+        entry = self.index[key]
+        h, w, c = entry["shape"]
+        start = entry["offset"]
+        return self.data[start:start + h * w * c].reshape(h, w, c)
+
+    def crop(self, key: str, box: dict, normalized: bool = False):
+        """View of ``box`` (``x, y, width, height``); ``normalized`` boxes are scaled by the page size.
+
+        Pixels match ``annotate.crop_box`` on the same box, i.e. position's ``crop_<id>.png``.
+        """
+        img = self.image(key)
+        if normalized:
+            # 与 annotate_position_page 相同的取整，之后按 crop_box 截断
+            pw, ph = self.index[key]["page_size"]
+            box = {"x": round(box["x"] * pw, 3), "y": round(box["y"] * ph, 3),
+                   "width": round(box["width"] * pw, 3), "height": round(box["height"] * ph, 3)}
+        x, y, bw, bh = map(int, (box["x"], box["y"], box["width"], box["height"]))
+        h, w = img.shape[:2]
+        x0 = min(max(x, 0), w)
+        y0 = min(max(y, 0), h)
+        x1 = min(max(x + bw, x0), w)
+        y1 = min(max(y + bh, y0), h)
+        return img[y0:y1, x0:x1]
+
+    def blocks(self, key: str):
+        return self.index[key]["blocks"]
+
+    def block_crop(self, key: str, block_id: str):
+        for block in self.index[key]["blocks"]:
+            if block["id"] == block_id:
+                return self.crop(key, block["box"], normalized=True)
+        raise KeyError(f"{key}: no block {block_id!r}")
+
+    def iter_blocks(self):
+        """All ``(key, block_id)`` pairs, e.g. for random sampling across pages."""
+        for key, entry in self.index.items():
+            for block in entry["blocks"]:
+                yield key, block["id"]
+
+
+# ─── 从 position 输出构建 ───────────────────────────────────────────────────
+def _load_page(meta_path: Path):
+    import numpy as np
+    from PIL import Image
+
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if isinstance(meta.get("position"), dict):
+            # pipeline 记录：position 阶段的结果和裁剪目录
+            elements = meta["position"]
+            clean_path = meta_path.parent / "position" / "random_crops" / "original.png"
+        else:
+            elements = meta.get("elements") or {}
+            clean_path = meta_path.parent / "random_crops" / "original.png"
+        if not clean_path.exists():
+            return None
+        with Image.open(clean_path) as img:
+            pixels = np.asarray(img.convert("RGB"))
+    except Exception as e:
+        # 单页损坏不影响整体构建
+        logging.error("✗ %s: %s", meta_path.parent, e)
+        return None
+    return pixels, elements.get("page_size"), elements.get("all_blocks", [])
+
+
+def build_store(output_root: Path, store_dir: Path, workers=None, batch_size: int = BATCH_SIZE,
+                prefix=None, replace: bool = False) -> int:
+    """Decode every position (or pipeline) render under ``output_root`` into the store; returns the number of pages added.
+
+    Keys are ``<prefix>/<page dir>``, with ``prefix`` defaulting to ``output_root``'s name.
+    """
+    prefix = output_root.resolve().name if prefix is None else prefix
+    metas = sorted(output_root.rglob(META_NAME))
+    keys = [f"{prefix}/{m.parent.relative_to(output_root).as_posix()}" for m in metas]
+    added = 0
+    with RasterStoreWriter(store_dir) as writer:
+        if not replace:
+            todo = [(k, m) for k, m in zip(keys, metas) if k not in writer.index]
+            keys, metas = [k for k, _ in todo], [m for _, m in todo]
+        if workers == 1:
+            pages = map(_load_page, metas)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            pool = ProcessPoolExecutor(max_workers=workers)
+            pages = pool.map(_load_page, metas, chunksize=batch_size)
+        try:
+            for key, page in zip(keys, pages):
+                if page is None:
+                    continue
+                pixels, page_size, blocks = page
+                added += writer.add(key, pixels, page_size, blocks, replace)
+        finally:
+            if workers != 1:
+                pool.shutdown()
+    return added
+
+
+def compact_store(store_dir: Path) -> int:
+    """Rewrite ``pages.raw`` with only the indexed pages; returns the bytes reclaimed."""
+    store_dir = Path(store_dir)
+    data_path = store_dir / DATA_NAME
+    with open(store_dir / INDEX_NAME, encoding="utf-8") as f:
+        index = json.load(f)
+    before = data_path.stat().st_size
+
+    tmp_data = store_dir / (DATA_NAME + ".tmp")
+    with open(data_path, "rb") as src, open(tmp_data, "wb") as dst:
+        for entry in sorted(index.values(), key=lambda e: e["offset"]):
+            h, w, c = entry["shape"]
+            src.seek(entry["offset"])
+            pad = -dst.tell() % ALIGN
+            if pad:
+                dst.write(b"\0" * pad)
+            entry["offset"] = dst.tell()
+            dst.write(src.read(h * w * c))
+    tmp_index = store_dir / (INDEX_NAME + ".tmp")
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    # 数据先就位，索引再替换
+    tmp_data.replace(data_path)
+    tmp_index.replace(store_dir / INDEX_NAME)
+    return before - data_path.stat().st_size
+
+
+# ─── MAIN ──────────────────────────────────────────────────────────────────
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Memory-mapped raster store for position renders.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="从 position 输出目录构建/追加 raster store")
+    build.add_argument("output_root", type=Path, help="position 的输出目录")
+    build.add_argument("store_dir", type=Path, help="raster store 目录")
+    build.add_argument("--workers", type=int, default=None, help="解码进程数；1 表示不用进程池")
+    build.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    build.add_argument("--prefix", help="键前缀，默认取输出目录名")
+    build.add_argument("--replace", action="store_true", help="重新写入已存在的键（旧数据待 compact 回收）")
+    compact = sub.add_parser("compact", help="重写 pages.raw，回收被替换页面占用的空间")
+    compact.add_argument("store_dir", type=Path, help="raster store 目录")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.command == "build":
+        n = build_store(args.output_root, args.store_dir, args.workers, args.batch_size, args.prefix, args.replace)
+        logging.info("✔ %d pages stored in %s", n, args.store_dir)
+    elif args.command == "compact":
+        freed = compact_store(args.store_dir)
+        logging.info("✔ reclaimed %d bytes in %s", freed, args.store_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Perturbation-effectiveness check on stored before/after renders.
+
+For every page the before and after images are decoded into NumPy arrays, a
+per-pixel change mask is built once, and its summed-area table gives the
+changed-pixel count of every perturbed box in a single vectorized lookup. A
+page whose perturbed regions are all visually unchanged is a no-op.
+
+Boxes come from each script's ``analysis_result.json``:
+    TextRobustness   selected_buttons[].bounding_box      original/disturbed.png
+    colorRobustness  recolored_buttons[].bbox             original/disturbed.png
+    layoutRobustness layout_shift.moved_elements          original/disturbed.png
+When a page has no boxes the whole image is checked. ``webrssbench.pipeline``
+records are verified stage by stage against the shared ``original.png``.
+Records without a perturbation (position output, or a pipeline run with only
+the position stage) are skipped: never rejected, and left unchanged.
+
+用法：
+    python -m webrssbench.verify OUTPUT_ROOT [--reject] [--workers N]
+"""
+
+import csv
+import json
+import shutil
+import logging
+import argparse
+from pathlib import Path
+
+META_NAME        = "analysis_result.json"
+PIXEL_TOLERANCE  = 16     # 单通道差值超过该值才算像素变化（滤掉抗锯齿/压缩噪声）
+MIN_CHANGED_FRAC = 0.01   # 区域内变化像素占比下限
+MIN_CHANGED_PX   = 20     # 区域内变化像素数下限（小按钮用）
+BATCH_SIZE       = 16
+REJECTED_CSV     = "rejected_pages.csv"
+PIPELINE_STAGES  = ("text", "color", "layout")
+
+
+def load_rgb(path):
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def changed_mask(before, after, tolerance: int = PIXEL_TOLERANCE):
+    """Boolean mask of visibly changed pixels over the common area of two images."""
+    import numpy as np
+
+    h = min(before.shape[0], after.shape[0])
+    w = min(before.shape[1], after.shape[1])
+    a = before[:h, :w].astype(np.int16)
+    b = after[:h, :w].astype(np.int16)
+    return np.abs(a - b).max(axis=2) > tolerance
+
+
+def region_deltas(mask, boxes):
+    """Changed-pixel count and area for every ``[x, y, w, h]`` box, in one pass.
+
+    Returns two int arrays ``(changed, area)``; boxes are clipped to the mask.
+    """
+    import numpy as np
+
+    h, w = mask.shape
+    sat = np.zeros((h + 1, w + 1), dtype=np.int64)
+    sat[1:, 1:] = mask.cumsum(axis=0, dtype=np.int64).cumsum(axis=1)
+
+    b = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    x0 = np.clip(np.floor(b[:, 0]), 0, w).astype(np.intp)
+    y0 = np.clip(np.floor(b[:, 1]), 0, h).astype(np.intp)
+    x1 = np.clip(np.ceil(b[:, 0] + b[:, 2]), 0, w).astype(np.intp)
+    y1 = np.clip(np.ceil(b[:, 1] + b[:, 3]), 0, h).astype(np.intp)
+
+    changed = sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0]
+    area = np.maximum(x1 - x0, 0) * np.maximum(y1 - y0, 0)
+    return changed, area
+
+
+def regions_from_meta(meta: dict, page_dir: Path):
+    """Return ``(before_png, after_png, boxes)`` for any of the three perturbation families."""
+    if "original" in meta:
+        before, after = meta["original"], meta["disturbed"]
+    else:
+        # 旧版 TextRobustness 只留了带框的图
+        before, after = meta["annotated_before"], meta["annotated_after"]
+
+    if "selected_buttons" in meta:
+        boxes = [b["bounding_box"] for b in meta["selected_buttons"]]
+    elif "recolored_buttons" in meta:
+        boxes = [b["bbox"] for b in meta["recolored_buttons"]]
+    else:
+        boxes = []
+        for m in meta.get("layout_shift", {}).get("moved_elements", []):
+            x, y, w, h = m["before"]
+            boxes.append([x, y, w, h])
+            boxes.append([x + m["dx"], y + m["dy"], w + m["dw"], h + m["dh"]])
+    return _resolve(page_dir, before), _resolve(page_dir, after), boxes
+
+
+def _resolve(page_dir: Path, path: str) -> Path:
+    # 绝对路径只用文件名，目录搬动后依然可用；相对路径相对页面目录
+    p = Path(path)
+    return page_dir / (p.name if p.is_absolute() else p)
+
+
+def verify_meta(meta: dict, page_dir: Path, cache=None) -> dict:
+    """Verify one perturbation record; ``cache`` reuses decoded images across calls."""
+    cache = {} if cache is None else cache
+    try:
+        before_png, after_png, boxes = regions_from_meta(meta, page_dir)
+        for png in (before_png, after_png):
+            if png not in cache:
+                cache[png] = load_rgb(png)
+        before, after = cache[before_png], cache[after_png]
+    except Exception as e:
+        return {"effective": False, "error": str(e)}
+
+    mask = changed_mask(before, after)
+    size_changed = before.shape != after.shape
+    if not boxes:
+        boxes = [[0, 0, mask.shape[1], mask.shape[0]]]
+
+    changed, area = region_deltas(mask, boxes)
+    effective = (changed >= MIN_CHANGED_PX) | (changed >= MIN_CHANGED_FRAC * area)
+    effective &= changed > 0
+    return {
+        "effective": bool(effective.any() or size_changed),
+        "regions": len(boxes),
+        "effective_regions": int(effective.sum()),
+        "changed_pixels": changed.tolist(),
+        "size_changed": size_changed,
+    }
+
+
+def verify_page(meta_path) -> dict:
+    meta_path = Path(meta_path)
+    page_dir = meta_path.parent
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except Exception as e:
+        return {"page_dir": str(page_dir), "effective": False, "error": str(e)}
+
+    attempted = [s for s in PIPELINE_STAGES if isinstance(meta.get(s), dict)]
+    if not attempted and "disturbed" not in meta and "annotated_after" not in meta:
+        # 没有扰动的记录（position）无从判定，跳过而不是拒绝
+        return {"page_dir": str(page_dir), "effective": True, "skipped": True}
+
+    stages = [s for s in attempted if "error" not in meta[s]]
+    if attempted and not stages:
+        return {"page_dir": str(page_dir), "effective": False, "error": "every perturbation stage failed"}
+    if stages:
+        # pipeline 记录：各阶段共用同一张 original.png，只解码一次
+        cache = {}
+        for s in stages:
+            meta[s]["verification"] = verify_meta({**meta[s], "original": meta["original"]}, page_dir, cache)
+        result = {"effective": all(meta[s]["verification"]["effective"] for s in stages),
+                  "stages": {s: meta[s]["verification"]["effective"] for s in stages}}
+    else:
+        result = verify_meta(meta, page_dir)
+        if "error" in result:
+            return {"page_dir": str(page_dir), **result}
+        meta["verification"] = result
+
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    return {"page_dir": str(page_dir), **result}
+
+
+def verify_tree(root: Path, workers=None, batch_size: int = BATCH_SIZE):
+    metas = sorted(root.rglob(META_NAME))
+    if workers == 1:
+        yield from map(verify_page, metas)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(verify_page, metas, chunksize=batch_size)
+
+
+# ─── MAIN ──────────────────────────────────────────────────────────────────
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Reject pages whose perturbation left the render unchanged.")
+    parser.add_argument("output_root", type=Path, help="任一扰动脚本的输出根目录")
+    parser.add_argument("--reject", action="store_true", help="删除无效页面的输出目录，以便重新生成")
+    parser.add_argument("--workers", type=int, default=None, help="进程数；1 表示不用进程池")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    rejected_path = args.output_root / REJECTED_CSV
+    total = ok = skipped = 0
+    with rejected_path.open("w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["page_dir", "reason"])
+        for result in verify_tree(args.output_root, args.workers, args.batch_size):
+            if result.get("skipped"):
+                skipped += 1
+                continue
+            total += 1
+            if result["effective"]:
+                ok += 1
+                continue
+            writer.writerow([result["page_dir"], result.get("error", "no visible change")])
+            if args.reject:
+                shutil.rmtree(result["page_dir"], ignore_errors=True)
+
+    logging.info("✔ %d/%d pages visibly perturbed, %d without a perturbation skipped. Rejected list -> %s",
+                 ok, total, skipped, rejected_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Viewport matrix shared by the render scripts.
+
+A page is loaded once; for every configured viewport the page is resized,
+left to settle, re-measured and captured. The viewport keeps the preset
+height and captures are full-page screenshots, in every script. Outputs go to
+``OUTPUT_ROOT/<viewport name>/...`` so each viewport subtree has the same
+layout as a single-viewport run.
+"""
+
+import re
+
+VIEWPORTS = {
+    "desktop": {"width": 1280, "height": 720},
+    "tablet":  {"width": 768,  "height": 1024},
+    "mobile":  {"width": 375,  "height": 667},
+}
+
+# 等字体加载完并多跑两帧，让 resize 触发的重排/媒体查询生效
+SETTLE_JS = """
+async () => {
+    if (document.fonts && document.fonts.ready) await document.fonts.ready;
+    await new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)));
+}
+"""
+
+
+def parse_viewports(spec: str) -> dict:
+    """``"desktop,mobile,1440x900"`` → ``{name: {"width", "height"}}``; keeps the given order."""
+    out = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        if item in VIEWPORTS:
+            out[item] = dict(VIEWPORTS[item])
+            continue
+        m = re.fullmatch(r"(\d+)x(\d+)", item)
+        if not m:
+            raise ValueError(f"unknown viewport {item!r}; use {', '.join(VIEWPORTS)} or WIDTHxHEIGHT")
+        out[item] = {"width": int(m.group(1)), "height": int(m.group(2))}
+    return out
+
+
+def add_viewport_args(parser):
+    parser.add_argument("--viewports", type=parse_viewports, default=None,
+                        help="逗号分隔的视口矩阵，如 desktop,tablet,mobile 或 1440x900；页面只加载一次")
+
+
+def settle(page):
+    page.evaluate(SETTLE_JS)
+
+
+def apply_viewport(page, size: dict):
+    page.set_viewport_size({"width": size["width"], "height": size["height"]})
+    settle(page)
+
+
+def fit_to_content(page, width: int):
+    """Grow the viewport to the full document height at ``width``; returns that height."""
+    height = page.evaluate("() => document.documentElement.scrollHeight")
+    page.set_viewport_size({"width": width, "height": height})
+    settle(page)
+    return height